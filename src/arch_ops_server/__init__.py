@@ -21,6 +21,7 @@ from .aur import (
 )
 from .pacman import (
     get_official_package_info,
+    get_official_package_infos,
     check_updates_dry_run,
     remove_package,
     remove_packages_batch,
@@ -50,6 +51,8 @@ from .system import (
 )
 from .system_health_check import run_system_health_check
 from .news import get_latest_news, check_critical_news, get_news_since_last_update, fetch_news
+from .news import close_http_client as close_news_client
+from .pacman import close_http_client as close_pacman_client
 from .logs import (
     get_transaction_history,
     find_when_installed,
@@ -64,6 +67,7 @@ from .mirrors import (
     suggest_fastest_mirrors,
     check_mirrorlist_health,
     optimize_mirrors,
+    close_http_client as close_mirror_client,
 )
 from .config import (
     analyze_pacman_conf,
@@ -95,10 +99,15 @@ async def main():
     logger.info(f"Running on Arch Linux: {IS_ARCH}")
 
     # Run the server using STDIO
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream, write_stream, server.create_initialization_options()
-        )
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream, write_stream, server.create_initialization_options()
+            )
+    finally:
+        await close_mirror_client()
+        await close_news_client()
+        await close_pacman_client()
 
 
 def main_sync():
@@ -134,6 +143,7 @@ __all__ = [
     "install_package_secure",
     # Pacman
     "get_official_package_info",
+    "get_official_package_infos",
     "check_updates_dry_run",
     "remove_package",
     "remove_packages_batch",
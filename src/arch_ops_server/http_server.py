@@ -28,6 +28,9 @@ try:
 except ImportError:
     SSE_AVAILABLE = False
 
+from .mirrors import close_http_client as close_mirror_client
+from .news import close_http_client as close_news_client
+from .pacman import close_http_client as close_pacman_client
 from .server import server
 from . import __version__
 
@@ -817,7 +820,12 @@ async def run_http_server(host: str = "0.0.0.0", port: int = 8080) -> None:
 
     # Run server
     server_instance = uvicorn.Server(config)
-    await server_instance.serve()
+    try:
+        await server_instance.serve()
+    finally:
+        await close_mirror_client()
+        await close_news_client()
+        await close_pacman_client()
 
 
 def main_http():
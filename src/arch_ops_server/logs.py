@@ -4,11 +4,15 @@ Pacman transaction log parsing module.
 Parses and analyzes pacman transaction logs for troubleshooting and auditing.
 """
 
+import asyncio
+import functools
 import logging
+import os
 import re
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 
 from .utils import (
     IS_ARCH,
@@ -20,22 +24,244 @@ logger = logging.getLogger(__name__)
 # Pacman log file path
 PACMAN_LOG = "/var/log/pacman.log"
 
+# Block size used when reading the log backwards
+TAIL_CHUNK_SIZE = 64 * 1024
 
-def parse_log_line(line: str) -> Optional[Dict[str, Any]]:
+# Line prefix: [YYYY-MM-DD HH:MM]
+_TIMESTAMP_RE = re.compile(r'\[(\d{4}-\d{2}-\d{2})\s+(\d{2}:\d{2})\]')
+
+# ALPM verbs that always carry "package (version)" details
+_TRANSACTION_ACTIONS = frozenset(
+    ["installed", "upgraded", "removed", "downgraded", "reinstalled"]
+)
+
+# Full line: [YYYY-MM-DD HH:MM] [SOURCE] details
+_LOG_LINE_RE = re.compile(
+    r'\[(\d{4}-\d{2}-\d{2})\s+(\d{2}:\d{2})\]\s+\[(\w+)\]\s+(.+)'
+)
+
+
+def iter_lines_reversed(
+    path: Path,
+    chunk_size: int = TAIL_CHUNK_SIZE
+) -> Iterator[str]:
     """
-    Parse a single line from pacman log.
+    Yield lines of a file from last to first.
+
+    Reads fixed-size blocks from the end of the file, so callers that stop
+    after the most recent entries only touch the tail of a large log. Shared
+    with other modules that scan the pacman log (e.g. news).
+
+    Args:
+        path: File to read
+        chunk_size: Number of bytes to read per block
+
+    Yields:
+        Decoded lines, most recent first (empty lines are skipped)
+    """
+    with open(path, 'rb') as f:
+        fd = f.fileno()
+        pos = os.fstat(fd).st_size
+        remainder = b""
+
+        while pos > 0:
+            size = min(chunk_size, pos)
+            pos -= size
+            lines = (os.pread(fd, size, pos) + remainder).split(b"\n")
+            # The first piece may be a partial line; finish it with the next block
+            remainder = lines.pop(0)
+            for raw in reversed(lines):
+                if raw:
+                    yield raw.decode("utf-8", errors="replace")
+
+        if remainder:
+            yield remainder.decode("utf-8", errors="replace")
+
+
+@dataclass
+class _ParsedLog:
+    """
+    Column-oriented view of a parsed pacman log.
+
+    Row i of every entry column describes the same transaction line; `lines`
+    keeps every raw line (parsed or not) for keyword scans.
+    """
+    lines: List[str] = field(default_factory=list)
+    timestamps: List[str] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)
+    actions: List[str] = field(default_factory=list)
+    packages: List[str] = field(default_factory=list)
+    versions: List[str] = field(default_factory=list)
+    raw: List[str] = field(default_factory=list)
+
+    def entry(self, i: int) -> Dict[str, Any]:
+        """Materialise row i in the parse_log_line() dict format."""
+        return {
+            "timestamp": self.timestamps[i],
+            "source": self.sources[i],
+            "action": self.actions[i],
+            "package": self.packages[i],
+            "version_info": self.versions[i],
+            "raw_line": self.raw[i]
+        }
+
+
+@functools.lru_cache(maxsize=1)
+def _parse_log(path: str, mtime_ns: int, size: int) -> _ParsedLog:
+    """
+    Read and parse the whole pacman log.
+
+    The modification time and size are only part of the cache key, so an
+    unchanged log is parsed once and reused across queries while any write
+    to it invalidates the entry.
+
+    Args:
+        path: Log file path
+        mtime_ns: File modification time in nanoseconds
+        size: File size in bytes
+
+    Returns:
+        Parsed log columns in file order
+    """
+    with open(path, 'r') as f:
+        lines = f.read().split('\n')
+    if lines and not lines[-1]:
+        lines.pop()
+
+    # Tokenize to tuples and transpose into columns in one pass, without
+    # building a dict per line
+    rows = [row for row in map(_tokenize_log_line, lines) if row]
+    columns = [list(column) for column in zip(*rows)] or [[] for _ in range(6)]
+
+    return _ParsedLog(lines, *columns)
+
+
+def _load_log(path: Path) -> _ParsedLog:
+    """
+    Get the parsed pacman log, reusing the cache while the file is unchanged.
+
+    The returned columns are shared between calls and must not be modified.
+
+    Args:
+        path: Log file path
+
+    Returns:
+        Parsed log columns in file order
+    """
+    st = os.stat(path)
+    return _parse_log(str(path), st.st_mtime_ns, st.st_size)
+
+
+def _parse_since(since: str) -> str:
+    """
+    Normalize a `since` argument to the timestamp column's layout.
+
+    Args:
+        since: ISO date or timestamp (e.g. "2025-11-01" or
+            "2025-11-01T12:00:00"); timezone-aware values are converted to
+            local time, which is what pacman.log records
+
+    Returns:
+        Timestamp as "YYYY-MM-DDTHH:MM:00"
+
+    Raises:
+        ValueError: If since is not an ISO date or timestamp
+    """
+    parsed = datetime.fromisoformat(since)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed.strftime("%Y-%m-%dT%H:%M:00")
+
+
+def _package_rows(
+    log: _ParsedLog,
+    package_name: str,
+    since: Optional[str] = None
+) -> List[int]:
+    """
+    Find the rows of a package's transactions, optionally from a start time.
+
+    The timestamp column holds local times without their UTC offset, so it
+    is not guaranteed to be sorted (DST fall-back, clock or timezone
+    changes); every row is checked rather than binary-searching for a start.
+
+    Args:
+        log: Parsed log columns
+        package_name: Package to look for
+        since: Optional timestamp normalized by _parse_since(); earlier
+            entries are skipped
+
+    Returns:
+        Row indices in file order
+    """
+    packages = log.packages
+    rows = [i for i, package in enumerate(packages) if package == package_name]
+    if since:
+        timestamps = log.timestamps
+        rows = [i for i in rows if timestamps[i] >= since]
+    return rows
+
+
+def _split_package_version(text: str) -> Optional[tuple[str, str]]:
+    """
+    Split "package (version)" into its parts.
+
+    Anchors on the last " (" instead of using a regex, so long lines
+    without a closing parenthesis are rejected in linear time.
+
+    Args:
+        text: Text following the action verb
+
+    Returns:
+        Tuple of (package, version_info) or None if the text doesn't match
+    """
+    package, sep, version = text.strip().rpartition(" (")
+    package = package.strip()
+    if not sep or not package or " " in package or not version.endswith(")"):
+        return None
+    return package, version[:-1]
+
+
+def log_timestamp(line: str) -> Optional[str]:
+    """
+    Extract the ISO timestamp from a "[YYYY-MM-DD HH:MM]" line prefix.
+
+    The prefix has a fixed layout, so it is sliced directly and the regex is
+    only used for lines that don't fit it exactly (e.g. extra whitespace).
+    Public so other modules reading the pacman log use the same format.
+
+    Args:
+        line: Log line
+
+    Returns:
+        Timestamp as "YYYY-MM-DDTHH:MM:00" or None if the line has none
+    """
+    if (
+        line[:1] == "[" and line[11:12] == " " and line[17:18] == "]"
+        and line[5] == "-" and line[8] == "-" and line[14] == ":"
+        and (line[1:5] + line[6:8] + line[9:11] + line[12:14] + line[15:17]).isdigit()
+    ):
+        return f"{line[1:11]}T{line[12:17]}:00"
+
+    match = _TIMESTAMP_RE.match(line)
+    if match:
+        return f"{match.group(1)}T{match.group(2)}:00"
+    return None
+
+
+def _tokenize_log_line(line: str) -> Optional[tuple[str, str, str, str, str, str]]:
+    """
+    Split a pacman log line into its fields.
 
     Args:
         line: Log line to parse
 
     Returns:
-        Dict with parsed data or None if not a transaction line
+        Tuple of (timestamp, source, action, package, version_info, raw_line)
+        or None if not a transaction line or a malformed one
     """
     # Format: [YYYY-MM-DD HH:MM] [ACTION] package (version)
-    match = re.match(
-        r'\[(\d{4}-\d{2}-\d{2})\s+(\d{2}:\d{2})\]\s+\[(\w+)\]\s+(.+)',
-        line
-    )
+    match = _LOG_LINE_RE.match(line)
 
     if not match:
         return None
@@ -52,36 +278,140 @@ def parse_log_line(line: str) -> Optional[Dict[str, Any]]:
         # Format: action package (version)
         # e.g. installed vim (9.0.1000-1)
         # e.g. upgraded linux (6.6.1-1 -> 6.6.2-1)
-        pkg_match = re.match(r'(\w+)\s+(\S+)\s+\((.+)\)', details)
-        
-        if pkg_match:
-            action = pkg_match.group(1)  # installed, upgraded, etc.
-            package = pkg_match.group(2)
-            version_info = pkg_match.group(3)
+        verb, _, tail = details.partition(" ")
+        pkg_version = _split_package_version(tail)
+
+        if verb and pkg_version:
+            action = verb  # installed, upgraded, etc.
+            package, version_info = pkg_version
+        elif verb in _TRANSACTION_ACTIONS:
+            # Truncated or garbled transaction; skip it rather than record
+            # the whole text as a package name
+            return None
     
     # Fallback for old parsing or non-ALPM lines that might match the old regex
     if action == log_type and log_type != "ALPM":
          # Parse package details for generic logs if needed
          # Format: "package_name (version)" or "package_name (old -> new)"
-         pkg_match = re.match(r'(\S+)\s+\((.+)\)', details)
-         if pkg_match:
-             package = pkg_match.group(1)
-             version_info = pkg_match.group(2)
+         pkg_version = _split_package_version(details)
+         if pkg_version:
+             package, version_info = pkg_version
+
+    return timestamp, log_type, action, package, version_info, line.strip()
+
+
+def parse_log_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse a single line from pacman log.
+
+    Args:
+        line: Log line to parse
+
+    Returns:
+        Dict with parsed data or None if not a transaction line
+    """
+    row = _tokenize_log_line(line)
+    if row is None:
+        return None
 
+    timestamp, source, action, package, version_info, raw_line = row
     return {
         "timestamp": timestamp,
-        "source": log_type,
+        "source": source,
         "action": action,
         "package": package,
         "version_info": version_info,
-        "raw_line": line.strip()
+        "raw_line": raw_line
     }
 
 
+def _tail_transactions(
+    pacman_log: Path,
+    actions: List[str],
+    limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Collect the most recent transactions whose action is in `actions`.
+
+    Blocking; run it with asyncio.to_thread() from async code.
+
+    Args:
+        pacman_log: Log file path
+        actions: Lowercase action names to keep
+        limit: Maximum number of transactions to return
+
+    Returns:
+        Parsed transactions, most recent first
+    """
+    transactions = []
+    # The action verb is surrounded by spaces in "[...] [ALPM] installed vim (...)"
+    needles = [f" {action} " for action in actions]
+
+    # Process in reverse order for most recent first
+    for line in iter_lines_reversed(pacman_log):
+        if len(transactions) >= limit:
+            break
+
+        # Only parse lines that can hold one of the wanted actions
+        if not any(needle in line for needle in needles):
+            continue
+
+        parsed = parse_log_line(line)
+        if parsed and parsed["action"].lower() in actions:
+            transactions.append(parsed)
+
+    return transactions
+
+
+def _tail_sync_events(pacman_log: Path, limit: int) -> List[Dict[str, Any]]:
+    """
+    Collect the most recent database sync and full upgrade events.
+
+    Blocking; run it with asyncio.to_thread() from async code.
+
+    Args:
+        pacman_log: Log file path
+        limit: Maximum number of events to return
+
+    Returns:
+        Sync events, most recent first
+    """
+    sync_events = []
+
+    # Process in reverse order for most recent first
+    for line in iter_lines_reversed(pacman_log):
+        if len(sync_events) >= limit:
+            break
+
+        # Both events are logged by pacman itself; skip ALPM lines cheaply
+        if "[PACMAN]" not in line:
+            continue
+
+        # Look for database synchronization entries
+        if "synchronizing package lists" in line:
+            event_type = "sync"
+        elif "starting full system upgrade" in line:
+            event_type = "full_upgrade"
+        else:
+            continue
+
+        timestamp = log_timestamp(line)
+
+        if timestamp:
+            sync_events.append({
+                "timestamp": timestamp,
+                "type": event_type,
+                "message": line.strip()
+            })
+
+    return sync_events
+
+
 async def query_package_history(
     query_type: str,
     package_name: Optional[str] = None,
-    limit: int = 50
+    limit: int = 50,
+    since: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Unified tool for querying package history from pacman logs.
@@ -96,6 +426,8 @@ async def query_package_history(
         query_type: Type of query - 'all', 'package', 'failures', or 'sync'
         package_name: Package name (required for 'package' query type)
         limit: Maximum number of results to return (default 50)
+        since: Only consider entries at or after this ISO date/timestamp
+            (used by the 'package' query type)
     
     Returns:
         Dict with query results based on query_type
@@ -122,6 +454,15 @@ async def query_package_history(
             "InvalidParameter",
             "package_name is required for query_type='package'"
         )
+
+    if since is not None:
+        try:
+            since = _parse_since(since)
+        except ValueError:
+            return create_error_response(
+                "InvalidParameter",
+                f"Invalid since '{since}'. Use an ISO date or timestamp, e.g. 2025-11-01 or 2025-11-01T12:00"
+            )
     
     try:
         pacman_log = Path(PACMAN_LOG)
@@ -136,7 +477,7 @@ async def query_package_history(
         if query_type == "all":
             return await _query_all_transactions(pacman_log, limit)
         elif query_type == "package":
-            return await _query_package_history(pacman_log, package_name, limit)
+            return await _query_package_history(pacman_log, package_name, limit, since)
         elif query_type == "failures":
             return await _query_failed_transactions(pacman_log, limit)
         elif query_type == "sync":
@@ -155,19 +496,12 @@ async def _query_all_transactions(
     limit: int
 ) -> Dict[str, Any]:
     """Get recent package transactions."""
-    transactions = []
-    
-    with open(pacman_log, 'r') as f:
-        lines = f.readlines()
-    
-    # Process in reverse order for most recent first
-    for line in reversed(lines):
-        if len(transactions) >= limit:
-            break
-        
-        parsed = parse_log_line(line)
-        if parsed and parsed["action"].lower() in ["installed", "upgraded", "removed", "downgraded", "reinstalled"]:
-            transactions.append(parsed)
+    transactions = await asyncio.to_thread(
+        _tail_transactions,
+        pacman_log,
+        ["installed", "upgraded", "removed", "downgraded", "reinstalled"],
+        limit
+    )
     
     logger.info(f"Found {len(transactions)} transactions")
     
@@ -181,29 +515,28 @@ async def _query_all_transactions(
 async def _query_package_history(
     pacman_log: Path,
     package_name: str,
-    limit: int
+    limit: int,
+    since: Optional[str] = None
 ) -> Dict[str, Any]:
     """Find when a package was installed and its history."""
     first_install = None
     upgrades = []
     removals = []
     
-    with open(pacman_log, 'r') as f:
-        for line in f:
-            parsed = parse_log_line(line)
-            if not parsed or parsed["package"] != package_name:
-                continue
-            
-            action = parsed["action"].lower()
-            
-            if action == "installed":
-                if first_install is None:
-                    first_install = parsed
-            elif action in ["upgraded", "downgraded", "reinstalled"]:
-                upgrades.append(parsed)
-            elif action == "removed":
-                removals.append(parsed)
-    
+    log = await asyncio.to_thread(_load_log, pacman_log)
+    rows = _package_rows(log, package_name, since)
+
+    for i in rows:
+        action = log.actions[i].lower()
+        
+        if action == "installed":
+            if first_install is None:
+                first_install = log.entry(i)
+        elif action in ["upgraded", "downgraded", "reinstalled"]:
+            upgrades.append(log.entry(i))
+        elif action == "removed":
+            removals.append(log.entry(i))
+
     if first_install is None:
         return create_error_response(
             "NotFound",
@@ -232,27 +565,24 @@ async def _query_failed_transactions(
     failed_transactions = []
     error_keywords = ["error", "failed", "warning", "could not", "unable to", "conflict"]
     
-    with open(pacman_log, 'r') as f:
-        for line in f:
-            line_lower = line.lower()
+    log = await asyncio.to_thread(_load_log, pacman_log)
+    for line in log.lines:
+        line_lower = line.lower()
+        
+        # Check for error indicators
+        if any(keyword in line_lower for keyword in error_keywords):
+            # Extract timestamp if available
+            timestamp = log_timestamp(line) or ""
             
-            # Check for error indicators
-            if any(keyword in line_lower for keyword in error_keywords):
-                # Extract timestamp if available
-                timestamp_match = re.match(r'\[(\d{4}-\d{2}-\d{2})\s+(\d{2}:\d{2})\]', line)
-                timestamp = ""
-                if timestamp_match:
-                    timestamp = f"{timestamp_match.group(1)}T{timestamp_match.group(2)}:00"
-                
-                # Extract severity
-                severity = "error" if "error" in line_lower or "failed" in line_lower else "warning"
-                
-                failed_transactions.append({
-                    "timestamp": timestamp,
-                    "severity": severity,
-                    "message": line.strip()
-                })
-    
+            # Extract severity
+            severity = "error" if "error" in line_lower or "failed" in line_lower else "warning"
+            
+            failed_transactions.append({
+                "timestamp": timestamp,
+                "severity": severity,
+                "message": line.strip()
+            })
+
     # Limit to most recent entries
     failed_transactions = failed_transactions[-limit:]
     
@@ -271,32 +601,7 @@ async def _query_sync_history(
     limit: int
 ) -> Dict[str, Any]:
     """Get database synchronization history."""
-    sync_events = []
-    
-    with open(pacman_log, 'r') as f:
-        lines = f.readlines()
-    
-    # Process in reverse order for most recent first
-    for line in reversed(lines):
-        if len(sync_events) >= limit:
-            break
-        
-        # Look for database synchronization entries
-        if "synchronizing package lists" in line.lower() or "starting full system upgrade" in line.lower():
-            timestamp_match = re.match(r'\[(\d{4}-\d{2}-\d{2})\s+(\d{2}:\d{2})\]', line)
-            
-            if timestamp_match:
-                timestamp = f"{timestamp_match.group(1)}T{timestamp_match.group(2)}:00"
-                
-                event_type = "sync"
-                if "starting full system upgrade" in line.lower():
-                    event_type = "full_upgrade"
-                
-                sync_events.append({
-                    "timestamp": timestamp,
-                    "type": event_type,
-                    "message": line.strip()
-                })
+    sync_events = await asyncio.to_thread(_tail_sync_events, pacman_log, limit)
     
     logger.info(f"Found {len(sync_events)} sync events")
     
@@ -342,7 +647,6 @@ async def get_transaction_history(
                 f"Pacman log file not found at {PACMAN_LOG}"
             )
 
-        transactions = []
         valid_actions = {
             "all": ["installed", "upgraded", "removed", "downgraded", "reinstalled"],
             "install": ["installed"],
@@ -353,17 +657,9 @@ async def get_transaction_history(
         actions_to_match = valid_actions.get(transaction_type, valid_actions["all"])
 
         # Read log file from end (most recent first)
-        with open(pacman_log, 'r') as f:
-            lines = f.readlines()
-
-        # Process in reverse order for most recent first
-        for line in reversed(lines):
-            if len(transactions) >= limit:
-                break
-
-            parsed = parse_log_line(line)
-            if parsed and parsed["action"].lower() in actions_to_match:
-                transactions.append(parsed)
+        transactions = await asyncio.to_thread(
+            _tail_transactions, pacman_log, actions_to_match, limit
+        )
 
         logger.info(f"Found {len(transactions)} transactions")
 
@@ -381,12 +677,17 @@ async def get_transaction_history(
         )
 
 
-async def find_when_installed(package_name: str) -> Dict[str, Any]:
+async def find_when_installed(
+    package_name: str,
+    since: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Find when a package was first installed and its upgrade history.
 
     Args:
         package_name: Name of the package to search for
+        since: Only consider entries at or after this ISO date/timestamp
+            (e.g. "2025-11-01")
 
     Returns:
         Dict with installation date and upgrade history
@@ -399,6 +700,15 @@ async def find_when_installed(package_name: str) -> Dict[str, Any]:
 
     logger.info(f"Finding installation history for package: {package_name}")
 
+    if since is not None:
+        try:
+            since = _parse_since(since)
+        except ValueError:
+            return create_error_response(
+                "InvalidParameter",
+                f"Invalid since '{since}'. Use an ISO date or timestamp, e.g. 2025-11-01 or 2025-11-01T12:00"
+            )
+
     try:
         pacman_log = Path(PACMAN_LOG)
 
@@ -412,21 +722,19 @@ async def find_when_installed(package_name: str) -> Dict[str, Any]:
         upgrades = []
         removals = []
 
-        with open(pacman_log, 'r') as f:
-            for line in f:
-                parsed = parse_log_line(line)
-                if not parsed or parsed["package"] != package_name:
-                    continue
+        log = await asyncio.to_thread(_load_log, pacman_log)
+        rows = _package_rows(log, package_name, since)
 
-                action = parsed["action"].lower()
+        for i in rows:
+            action = log.actions[i].lower()
 
-                if action == "installed":
-                    if first_install is None:
-                        first_install = parsed
-                elif action in ["upgraded", "downgraded", "reinstalled"]:
-                    upgrades.append(parsed)
-                elif action == "removed":
-                    removals.append(parsed)
+            if action == "installed":
+                if first_install is None:
+                    first_install = log.entry(i)
+            elif action in ["upgraded", "downgraded", "reinstalled"]:
+                upgrades.append(log.entry(i))
+            elif action == "removed":
+                removals.append(log.entry(i))
 
         if first_install is None:
             return create_error_response(
@@ -481,26 +789,23 @@ async def find_failed_transactions() -> Dict[str, Any]:
         failed_transactions = []
         error_keywords = ["error", "failed", "warning", "could not", "unable to", "conflict"]
 
-        with open(pacman_log, 'r') as f:
-            for line in f:
-                line_lower = line.lower()
+        log = await asyncio.to_thread(_load_log, pacman_log)
+        for line in log.lines:
+            line_lower = line.lower()
 
-                # Check for error indicators
-                if any(keyword in line_lower for keyword in error_keywords):
-                    # Extract timestamp if available
-                    timestamp_match = re.match(r'\[(\d{4}-\d{2}-\d{2})\s+(\d{2}:\d{2})\]', line)
-                    timestamp = ""
-                    if timestamp_match:
-                        timestamp = f"{timestamp_match.group(1)}T{timestamp_match.group(2)}:00"
+            # Check for error indicators
+            if any(keyword in line_lower for keyword in error_keywords):
+                # Extract timestamp if available
+                timestamp = log_timestamp(line) or ""
 
-                    # Extract severity
-                    severity = "error" if "error" in line_lower or "failed" in line_lower else "warning"
+                # Extract severity
+                severity = "error" if "error" in line_lower or "failed" in line_lower else "warning"
 
-                    failed_transactions.append({
-                        "timestamp": timestamp,
-                        "severity": severity,
-                        "message": line.strip()
-                    })
+                failed_transactions.append({
+                    "timestamp": timestamp,
+                    "severity": severity,
+                    "message": line.strip()
+                })
 
         # Limit to most recent 100 failures
         failed_transactions = failed_transactions[-100:]
@@ -549,32 +854,7 @@ async def get_database_sync_history(limit: int = 20) -> Dict[str, Any]:
                 f"Pacman log file not found at {PACMAN_LOG}"
             )
 
-        sync_events = []
-
-        with open(pacman_log, 'r') as f:
-            lines = f.readlines()
-
-        # Process in reverse order for most recent first
-        for line in reversed(lines):
-            if len(sync_events) >= limit:
-                break
-
-            # Look for database synchronization entries
-            if "synchronizing package lists" in line.lower() or "starting full system upgrade" in line.lower():
-                timestamp_match = re.match(r'\[(\d{4}-\d{2}-\d{2})\s+(\d{2}:\d{2})\]', line)
-                
-                if timestamp_match:
-                    timestamp = f"{timestamp_match.group(1)}T{timestamp_match.group(2)}:00"
-                    
-                    event_type = "sync"
-                    if "starting full system upgrade" in line.lower():
-                        event_type = "full_upgrade"
-
-                    sync_events.append({
-                        "timestamp": timestamp,
-                        "type": event_type,
-                        "message": line.strip()
-                    })
+        sync_events = await asyncio.to_thread(_tail_sync_events, pacman_log, limit)
 
         logger.info(f"Found {len(sync_events)} sync events")
 
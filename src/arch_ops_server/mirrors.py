@@ -4,8 +4,9 @@ Mirror management module.
 Manages and optimizes pacman mirrors for better download performance.
 """
 
+import asyncio
+import heapq
 import logging
-import re
 import time
 from pathlib import Path
 from typing import Dict, Any, List, Optional
@@ -25,6 +26,43 @@ MIRRORLIST_PATH = "/etc/pacman.d/mirrorlist"
 # Arch Linux mirror status JSON
 MIRROR_STATUS_URL = "https://archlinux.org/mirrors/status/json/"
 
+# Seconds a mirror probe result is reused before the mirror is tested again
+PROBE_CACHE_TTL = 60.0
+
+# Mirror URL -> (probe result, time.monotonic() when it was taken)
+_probe_cache: Dict[str, tuple[Dict[str, Any], float]] = {}
+
+# Maximum number of mirrors probed at the same time
+PROBE_CONCURRENCY = 16
+
+# Shared HTTP client, created on first use so probes reuse keep-alive connections
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """
+    Get the module's shared HTTP client, creating it if needed.
+
+    Returns:
+        Open httpx.AsyncClient
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=10.0,
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=PROBE_CONCURRENCY * 2)
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client, if one was created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
 
 async def list_active_mirrors() -> Dict[str, Any]:
     """
@@ -57,27 +95,33 @@ async def list_active_mirrors() -> Dict[str, Any]:
             for line in f:
                 line = line.strip()
 
-                # Skip empty lines and comments that aren't mirrors
-                if not line or (line.startswith('#') and 'Server' not in line):
+                # Skip empty lines
+                if not line:
                     continue
 
-                # Check if it's a commented mirror
-                if line.startswith('#'):
-                    # Extract mirror URL
-                    match = re.search(r'Server\s*=\s*(.+)', line)
-                    if match:
-                        commented_mirrors.append({
-                            "url": match.group(1).strip(),
-                            "active": False
-                        })
-                elif line.startswith('Server'):
-                    # Active mirror
-                    match = re.search(r'Server\s*=\s*(.+)', line)
-                    if match:
-                        active_mirrors.append({
-                            "url": match.group(1).strip(),
-                            "active": True
-                        })
+                # "#Server = ..." is a commented-out mirror
+                commented = line.startswith('#')
+                body = line.lstrip('#').lstrip()
+
+                # Skip comments that aren't mirrors
+                if not body.startswith('Server'):
+                    continue
+
+                key, sep, url = body.partition('=')
+                url = url.strip()
+                if not sep or key.strip() != 'Server' or not url:
+                    continue
+
+                if commented:
+                    commented_mirrors.append({
+                        "url": url,
+                        "active": False
+                    })
+                else:
+                    active_mirrors.append({
+                        "url": url,
+                        "active": True
+                    })
 
         logger.info(f"Found {len(active_mirrors)} active, {len(commented_mirrors)} commented mirrors")
 
@@ -97,6 +141,78 @@ async def list_active_mirrors() -> Dict[str, Any]:
         )
 
 
+async def _probe_mirror(
+    client: httpx.AsyncClient,
+    mirror: str,
+    semaphore: asyncio.Semaphore
+) -> Dict[str, Any]:
+    """
+    Measure the response time of a single mirror.
+
+    Args:
+        client: HTTP client shared by all probes of one test run
+        mirror: Mirror URL as written in the mirrorlist
+        semaphore: Limits how many probes run concurrently
+
+    Returns:
+        Dict with latency, status code and success flag
+    """
+    # Reuse a recent probe instead of hitting the mirror again
+    cached = _probe_cache.get(mirror)
+    if cached and time.monotonic() - cached[1] < PROBE_CACHE_TTL:
+        return dict(cached[0])
+
+    # Replace $repo and $arch with actual values for testing
+    test_url = mirror.replace("$repo", "core").replace("$arch", "x86_64")
+
+    # Add a test file path (core.db is small and always present)
+    if not test_url.endswith('/'):
+        test_url += '/'
+    test_url += "core.db"
+
+    async with semaphore:
+        try:
+            start_time = time.perf_counter()
+            response = await client.head(test_url)
+            latency = (time.perf_counter() - start_time) * 1000  # Convert to ms
+
+            probe = {
+                "mirror": mirror,
+                "latency_ms": round(latency, 2),
+                "status_code": response.status_code,
+                "success": response.status_code == 200
+            }
+
+        except httpx.TimeoutException:
+            probe = {
+                "mirror": mirror,
+                "latency_ms": -1,
+                "status_code": 0,
+                "success": False,
+                "error": "timeout"
+            }
+
+        except Exception as e:
+            probe = {
+                "mirror": mirror,
+                "latency_ms": -1,
+                "status_code": 0,
+                "success": False,
+                "error": str(e)
+            }
+
+    # Drop expired probes so mirrors that left the mirrorlist don't pile up
+    now = time.monotonic()
+    expired = [
+        url for url, (_, taken_at) in _probe_cache.items()
+        if now - taken_at >= PROBE_CACHE_TTL
+    ]
+    for url in expired:
+        del _probe_cache[url]
+    _probe_cache[mirror] = (probe, now)
+    return dict(probe)
+
+
 async def test_mirror_speed(mirror_url: Optional[str] = None) -> Dict[str, Any]:
     """
     Test mirror response time.
@@ -134,47 +250,15 @@ async def test_mirror_speed(mirror_url: Optional[str] = None) -> Dict[str, Any]:
                 "No mirrors to test"
             )
 
-        results = []
-
-        async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-            for mirror in mirrors_to_test:
-                # Replace $repo and $arch with actual values for testing
-                test_url = mirror.replace("$repo", "core").replace("$arch", "x86_64")
-                
-                # Add a test file path (core.db is small and always present)
-                if not test_url.endswith('/'):
-                    test_url += '/'
-                test_url += "core.db"
-
-                try:
-                    start_time = time.time()
-                    response = await client.head(test_url)
-                    latency = (time.time() - start_time) * 1000  # Convert to ms
-
-                    results.append({
-                        "mirror": mirror,
-                        "latency_ms": round(latency, 2),
-                        "status_code": response.status_code,
-                        "success": response.status_code == 200
-                    })
+        # The same mirror may be listed more than once
+        mirrors_to_test = list(dict.fromkeys(mirrors_to_test))
 
-                except httpx.TimeoutException:
-                    results.append({
-                        "mirror": mirror,
-                        "latency_ms": -1,
-                        "status_code": 0,
-                        "success": False,
-                        "error": "timeout"
-                    })
+        semaphore = asyncio.Semaphore(PROBE_CONCURRENCY)
 
-                except Exception as e:
-                    results.append({
-                        "mirror": mirror,
-                        "latency_ms": -1,
-                        "status_code": 0,
-                        "success": False,
-                        "error": str(e)
-                    })
+        client = _get_client()
+        results = list(await asyncio.gather(
+            *(_probe_mirror(client, mirror, semaphore) for mirror in mirrors_to_test)
+        ))
 
         # Sort by latency (successful tests first)
         results.sort(key=lambda x: (not x["success"], x["latency_ms"] if x["latency_ms"] > 0 else float('inf')))
@@ -212,76 +296,74 @@ async def suggest_fastest_mirrors(
     logger.info(f"Fetching mirror suggestions (country={country}, limit={limit})")
 
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get(MIRROR_STATUS_URL)
-            response.raise_for_status()
-
-            data = response.json()
-            mirrors = data.get("urls", [])
-
-            if not mirrors:
-                return create_error_response(
-                    "NoData",
-                    "No mirror data available from archlinux.org"
-                )
-
-            # Filter mirrors
-            filtered_mirrors = []
+        response = await _get_client().get(MIRROR_STATUS_URL, timeout=15.0)
+        response.raise_for_status()
 
-            for mirror in mirrors:
-                # Skip if country specified and doesn't match
-                if country and mirror.get("country_code") != country.upper():
-                    continue
-
-                # Skip if not active or has issues
-                if not mirror.get("active", False):
-                    continue
+        data = response.json()
+        mirrors = data.get("urls", [])
 
-                # Skip if last sync is too old (more than 24 hours)
-                last_sync = mirror.get("last_sync")
-                if last_sync is None:
-                    continue
-
-                # Calculate score (lower is better)
-                # Factors: completion percentage, delay, duration
-                completion = mirror.get("completion_pct", 0)
-                delay = mirror.get("delay", 0) or 0  # Handle None
-                duration_avg = mirror.get("duration_avg", 0) or 0
-
-                # Skip incomplete mirrors
-                if completion < 100:
-                    continue
-
-                # Score: delay (hours) + duration (seconds converted to hours equivalent)
-                score = delay + (duration_avg / 3600)
-
-                filtered_mirrors.append({
-                    "url": mirror.get("url"),
-                    "country": mirror.get("country"),
-                    "country_code": mirror.get("country_code"),
-                    "protocol": mirror.get("protocol"),
-                    "completion_pct": completion,
-                    "delay_hours": delay,
-                    "duration_avg": duration_avg,
-                    "duration_stddev": mirror.get("duration_stddev"),
-                    "score": round(score, 2),
-                    "last_sync": last_sync
-                })
-
-            # Sort by score (lower is better)
-            filtered_mirrors.sort(key=lambda x: x["score"])
+        if not mirrors:
+            return create_error_response(
+                "NoData",
+                "No mirror data available from archlinux.org"
+            )
 
-            # Limit results
-            suggested_mirrors = filtered_mirrors[:limit]
+        # Filter mirrors, keeping only (score, position, mirror) so output
+        # dicts are built just for the ones that are returned
+        candidates = []
+        country_code = country.upper() if country else None
+
+        for mirror in mirrors:
+            # Skip if country specified and doesn't match
+            if country_code and mirror.get("country_code") != country_code:
+                continue
+
+            # Skip if not active or has issues
+            if not mirror.get("active", False):
+                continue
+
+            # Skip if last sync is too old (more than 24 hours)
+            if mirror.get("last_sync") is None:
+                continue
+
+            # Skip incomplete mirrors
+            if mirror.get("completion_pct", 0) < 100:
+                continue
+
+            # Calculate score (lower is better)
+            # Score: delay (hours) + duration (seconds converted to hours equivalent)
+            delay = mirror.get("delay", 0) or 0  # Handle None
+            duration_avg = mirror.get("duration_avg", 0) or 0
+            score = round(delay + (duration_avg / 3600), 2)
+
+            # Position breaks ties in API order, matching a stable sort
+            candidates.append((score, len(candidates), mirror))
+
+        # Select the best-scoring mirrors without sorting the whole list
+        suggested_mirrors = [
+            {
+                "url": mirror.get("url"),
+                "country": mirror.get("country"),
+                "country_code": mirror.get("country_code"),
+                "protocol": mirror.get("protocol"),
+                "completion_pct": mirror.get("completion_pct", 0),
+                "delay_hours": mirror.get("delay", 0) or 0,
+                "duration_avg": mirror.get("duration_avg", 0) or 0,
+                "duration_stddev": mirror.get("duration_stddev"),
+                "score": score,
+                "last_sync": mirror.get("last_sync")
+            }
+            for score, _, mirror in heapq.nsmallest(limit, candidates)
+        ]
 
-            logger.info(f"Suggesting {len(suggested_mirrors)} mirrors")
+        logger.info(f"Suggesting {len(suggested_mirrors)} mirrors")
 
-            return {
-                "suggested_count": len(suggested_mirrors),
-                "total_available": len(filtered_mirrors),
-                "country_filter": country,
-                "mirrors": suggested_mirrors
-            }
+        return {
+            "suggested_count": len(suggested_mirrors),
+            "total_available": len(candidates),
+            "country_filter": country,
+            "mirrors": suggested_mirrors
+        }
 
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP error fetching mirror status: {e}")
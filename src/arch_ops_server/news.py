@@ -4,15 +4,27 @@ Arch Linux news feed integration module.
 Fetches and parses Arch Linux news announcements for critical updates.
 """
 
+import asyncio
+import functools
+import io
 import logging
 import re
-from datetime import datetime
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
-from xml.etree import ElementTree as ET
 
 import httpx
+from lxml import etree as ET
 
+try:
+    import h2  # noqa: F401 - enables HTTP/2 support in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+from .logs import PACMAN_LOG, iter_lines_reversed, log_timestamp
 from .utils import (
     IS_ARCH,
     run_command,
@@ -35,6 +47,193 @@ CRITICAL_KEYWORDS = [
     "important notice"
 ]
 
+# All critical keywords in one pattern; the lookahead also reports
+# overlapping matches (e.g. "requires manual action")
+_CRITICAL_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, CRITICAL_KEYWORDS)) + "))",
+    re.IGNORECASE
+)
+
+# Number of recent news items compared against the last system update
+SINCE_UPDATE_NEWS_LIMIT = 30
+
+# Seconds a cached feed body may be revalidated before it is fetched in full
+FEED_CACHE_MAX_AGE = 24 * 3600.0
+
+# Feed URL -> (ETag, Last-Modified, body, time.monotonic() when it was fetched)
+_feed_cache: Dict[str, tuple[Optional[str], Optional[str], bytes, float]] = {}
+
+# Shared HTTP client, created on first use so news polls reuse connections
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """
+    Get the module's shared HTTP client, creating it if needed.
+
+    Returns:
+        Open httpx.AsyncClient
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        # httpx already sends "Accept-Encoding: gzip, deflate" and decodes
+        # the body transparently; HTTP/2 needs the optional h2 package
+        _client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=4, max_connections=10),
+            http2=HTTP2_AVAILABLE
+        )
+    return _client
+
+
+async def _fetch_feed(url: str) -> bytes:
+    """
+    Download a feed, revalidating a cached copy with a conditional GET.
+
+    When the server answers 304 Not Modified the cached body is returned,
+    so an unchanged feed is not transferred again.
+
+    Args:
+        url: Feed URL
+
+    Returns:
+        Raw feed body
+
+    Raises:
+        httpx.HTTPStatusError: If the server returns an error status
+    """
+    headers = {}
+    cached = _feed_cache.get(url)
+    if cached and time.monotonic() - cached[3] < FEED_CACHE_MAX_AGE:
+        etag, last_modified, _, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    else:
+        cached = None
+
+    response = await _get_client().get(url, headers=headers)
+
+    if cached and response.status_code == 304:
+        logger.debug(f"Feed not modified, using cached copy: {url}")
+        return cached[2]
+
+    response.raise_for_status()
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        _feed_cache[url] = (etag, last_modified, response.content, time.monotonic())
+
+    return response.content
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client, if one was created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_pub_date(pub_date: str) -> str:
+    """
+    Convert an RSS pubDate to ISO 8601.
+
+    Cached because the same feed items are converted on every poll.
+
+    Args:
+        pub_date: Date in RFC 822 format
+
+    Returns:
+        ISO timestamp, or pub_date unchanged if it can't be parsed
+    """
+    try:
+        dt = parsedate_to_datetime(pub_date)
+    except ValueError:
+        return pub_date
+
+    if dt.tzinfo is None:
+        # "-0000" means UTC with no known local offset
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.isoformat()
+
+
+def _published_before(published_date: str, since_date: str) -> bool:
+    """
+    Check whether a news item was published before a given day.
+
+    Args:
+        published_date: ISO timestamp of the item (may be empty)
+        since_date: Date in ISO format (YYYY-MM-DD)
+
+    Returns:
+        True if the item is older than since_date; False if it is not or
+        either date can't be parsed
+    """
+    if not published_date:
+        return False
+
+    try:
+        item_date = datetime.fromisoformat(published_date.replace('Z', '+00:00'))
+        filter_date = datetime.fromisoformat(since_date + "T00:00:00+00:00")
+        return item_date < filter_date
+    except ValueError as e:
+        logger.warning(f"Failed to parse date for filtering: {e}")
+        return False
+
+
+def _parse_news_item(
+    item: ET._Element,
+    since_date: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Convert an RSS <item> element into a news dict.
+
+    Args:
+        item: RSS item element
+        since_date: Optional date in ISO format (YYYY-MM-DD) to filter news
+
+    Returns:
+        News dict, or None if the item is incomplete or older than since_date
+    """
+    # Collect child texts in one pass instead of a find() per field; the
+    # first occurrence wins, as with find()
+    fields: Dict[str, Optional[str]] = {}
+    for child in item:
+        fields.setdefault(child.tag, child.text)
+
+    if "title" not in fields or "link" not in fields:
+        return None
+
+    title = fields["title"]
+    link = fields["link"]
+    pub_date = fields.get("pubDate") or ""
+    description_text = fields.get("description")
+
+    # Parse description and strip HTML tags
+    description = ""
+    if description_text:
+        description = re.sub(r'<[^>]+>', '', description_text)
+        # Truncate to first 300 chars for summary
+        description = description[:300] + "..." if len(description) > 300 else description
+
+    # Parse date
+    published_date = _parse_pub_date(pub_date) if pub_date else ""
+
+    # Filter by date if requested
+    if since_date and _published_before(published_date, since_date):
+        return None
+
+    return {
+        "title": title,
+        "link": link,
+        "published": published_date,
+        "summary": description.strip()
+    }
+
 
 async def get_latest_news(
     limit: int = 10,
@@ -53,69 +252,36 @@ async def get_latest_news(
     logger.info(f"Fetching latest Arch Linux news (limit={limit})")
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(ARCH_NEWS_URL)
-            response.raise_for_status()
-
-            # Parse RSS feed
-            root = ET.fromstring(response.content)
-
-            # Find all items (RSS 2.0 format)
-            news_items = []
-            
-            for item in root.findall('.//item')[:limit]:
-                title_elem = item.find('title')
-                link_elem = item.find('link')
-                pub_date_elem = item.find('pubDate')
-                description_elem = item.find('description')
-
-                if title_elem is None or link_elem is None:
-                    continue
+        content = await _fetch_feed(ARCH_NEWS_URL)
+
+        # Stream items (RSS 2.0 format) instead of building the whole
+        # tree, and stop once `limit` items have been read
+        news_items = []
+        items = ET.iterparse(
+            io.BytesIO(content),
+            events=("end",),
+            tag="item",
+            resolve_entities=False,
+            no_network=True
+        )
+
+        for seen, (_, item) in enumerate(items):
+            if seen >= limit:
+                break
+
+            news_item = _parse_news_item(item, since_date)
+            if news_item:
+                news_items.append(news_item)
 
-                title = title_elem.text
-                link = link_elem.text
-                pub_date = pub_date_elem.text if pub_date_elem is not None else ""
-                
-                # Parse description and strip HTML tags
-                description = ""
-                if description_elem is not None and description_elem.text:
-                    description = re.sub(r'<[^>]+>', '', description_elem.text)
-                    # Truncate to first 300 chars for summary
-                    description = description[:300] + "..." if len(description) > 300 else description
-
-                # Parse date
-                published_date = ""
-                if pub_date:
-                    try:
-                        # Parse RFC 822 date format
-                        dt = datetime.strptime(pub_date, "%a, %d %b %Y %H:%M:%S %z")
-                        published_date = dt.isoformat()
-                    except ValueError:
-                        published_date = pub_date
-
-                # Filter by date if requested
-                if since_date and published_date:
-                    try:
-                        item_date = datetime.fromisoformat(published_date.replace('Z', '+00:00'))
-                        filter_date = datetime.fromisoformat(since_date + "T00:00:00+00:00")
-                        if item_date < filter_date:
-                            continue
-                    except ValueError as e:
-                        logger.warning(f"Failed to parse date for filtering: {e}")
-
-                news_items.append({
-                    "title": title,
-                    "link": link,
-                    "published": published_date,
-                    "summary": description.strip()
-                })
-
-            logger.info(f"Successfully fetched {len(news_items)} news items")
-
-            return {
-                "count": len(news_items),
-                "news": news_items
-            }
+            # Drop the processed item so memory stays bounded
+            item.clear(keep_tail=True)
+
+        logger.info(f"Successfully fetched {len(news_items)} news items")
+
+        return {
+            "count": len(news_items),
+            "news": news_items
+        }
 
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP error fetching news: {e}")
@@ -143,44 +309,31 @@ async def get_latest_news(
         )
 
 
-async def check_critical_news(limit: int = 20) -> Dict[str, Any]:
+def _critical_news_result(news_items: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
-    Check for critical Arch Linux news requiring manual intervention.
+    Pick the news items that mention a critical keyword.
 
     Args:
-        limit: Number of recent news items to check (default 20)
+        news_items: News dicts as returned by get_latest_news()
 
     Returns:
         Dict with critical news items
     """
-    logger.info("Checking for critical Arch Linux news")
-
-    result = await get_latest_news(limit=limit)
-
-    if "error" in result:
-        return result
-
-    news_items = result.get("news", [])
     critical_items = []
 
     # Scan for critical keywords
     for item in news_items:
-        title_lower = item["title"].lower()
-        summary_lower = item["summary"].lower()
-
-        # Check if any critical keyword is in title or summary
-        is_critical = any(
-            keyword in title_lower or keyword in summary_lower
-            for keyword in CRITICAL_KEYWORDS
-        )
+        # The newline keeps a keyword from matching across the
+        # title/summary boundary
+        text = f"{item['title']}\n{item['summary']}"
 
-        if is_critical:
-            # Identify which keywords matched
-            matched_keywords = [
-                keyword for keyword in CRITICAL_KEYWORDS
-                if keyword in title_lower or keyword in summary_lower
-            ]
+        # Identify which keywords matched in a single pass
+        found = {match.lower() for match in _CRITICAL_RE.findall(text)}
+        matched_keywords = [
+            keyword for keyword in CRITICAL_KEYWORDS if keyword in found
+        ]
 
+        if matched_keywords:
             critical_items.append({
                 **item,
                 "matched_keywords": matched_keywords,
@@ -197,93 +350,216 @@ async def check_critical_news(limit: int = 20) -> Dict[str, Any]:
     }
 
 
-async def get_news_since_last_update() -> Dict[str, Any]:
+async def check_critical_news(limit: int = 20) -> Dict[str, Any]:
     """
-    Get news posted since last pacman update.
-    Parses /var/log/pacman.log for last update timestamp.
+    Check for critical Arch Linux news requiring manual intervention.
+
+    Args:
+        limit: Number of recent news items to check (default 20)
+
+    Returns:
+        Dict with critical news items
+    """
+    logger.info("Checking for critical Arch Linux news")
+
+    result = await get_latest_news(limit=limit)
+
+    if "error" in result:
+        return result
+
+    return _critical_news_result(result.get("news", []))
+
+
+def _find_last_update(pacman_log: Path) -> Optional[datetime]:
+    """
+    Find the time of the most recent package change in the pacman log.
+
+    Reads the log backwards and stops at the first matching line, so only
+    the tail of a large log is touched. Blocking; run it with
+    asyncio.to_thread() from async code.
+
+    Args:
+        pacman_log: Log file path
+
+    Returns:
+        Timestamp of the last upgrade/install (as UTC), or None if not found
+    """
+    for line in iter_lines_reversed(pacman_log):
+        # Look for upgrade entries
+        if " upgraded " in line or " installed " in line or "starting full system upgrade" in line:
+            # Extract timestamp [YYYY-MM-DD HH:MM]
+            timestamp = log_timestamp(line)
+            if timestamp:
+                try:
+                    return datetime.fromisoformat(timestamp + "+00:00")
+                except ValueError:
+                    continue
+    return None
+
+
+def _news_since_update_result(
+    news_items: List[Dict[str, Any]],
+    last_update: datetime
+) -> Dict[str, Any]:
+    """
+    Pick the news items published after the last system update.
+
+    Args:
+        news_items: News dicts as returned by get_latest_news()
+        last_update: Time of the last system update
 
     Returns:
         Dict with news items posted after last update
     """
+    news_since_update = []
+
+    for item in news_items:
+        published_str = item.get("published", "")
+        if not published_str:
+            continue
+
+        try:
+            published = datetime.fromisoformat(published_str.replace('Z', '+00:00'))
+            if published > last_update:
+                news_since_update.append(item)
+        except ValueError as e:
+            logger.warning(f"Failed to parse date: {e}")
+            continue
+
+    logger.info(f"Found {len(news_since_update)} news items since last update")
+
+    return {
+        "last_update": last_update.isoformat(),
+        "news_count": len(news_since_update),
+        "has_news": len(news_since_update) > 0,
+        "news": news_since_update
+    }
+
+
+async def _load_last_update() -> Dict[str, Any]:
+    """
+    Look up the last system update time from the pacman log.
+
+    Returns:
+        Dict with "last_update" (datetime), or an error response
+    """
     if not IS_ARCH:
         return create_error_response(
             "NotSupported",
             "This feature is only available on Arch Linux"
         )
 
-    logger.info("Getting news since last pacman update")
+    # Parse pacman log for last update timestamp
+    pacman_log = Path(PACMAN_LOG)
 
-    try:
-        # Parse pacman log for last update timestamp
-        pacman_log = Path("/var/log/pacman.log")
+    if not pacman_log.exists():
+        return create_error_response(
+            "NotFound",
+            f"Pacman log file not found at {PACMAN_LOG}"
+        )
 
-        if not pacman_log.exists():
-            return create_error_response(
-                "NotFound",
-                "Pacman log file not found at /var/log/pacman.log"
-            )
+    # Find last system update timestamp
+    last_update = await asyncio.to_thread(_find_last_update, pacman_log)
+
+    if last_update is None:
+        logger.warning("Could not determine last update timestamp")
+        return create_error_response(
+            "NotFound",
+            "Could not determine last system update timestamp from pacman log"
+        )
+
+    logger.info(f"Last update: {last_update.isoformat()}")
+
+    return {"last_update": last_update}
 
-        # Find last system update timestamp
-        last_update = None
-
-        with open(pacman_log, 'r') as f:
-            for line in f:
-                # Look for upgrade entries
-                if " upgraded " in line or " installed " in line or "starting full system upgrade" in line:
-                    # Extract timestamp [YYYY-MM-DD HH:MM]
-                    match = re.match(r'\[(\d{4}-\d{2}-\d{2})\s+(\d{2}:\d{2})\]', line)
-                    if match:
-                        date_str = f"{match.group(1)}T{match.group(2)}:00+00:00"
-                        try:
-                            last_update = datetime.fromisoformat(date_str)
-                        except ValueError:
-                            continue
-
-        if last_update is None:
-            logger.warning("Could not determine last update timestamp")
-            return create_error_response(
-                "NotFound",
-                "Could not determine last system update timestamp from pacman log"
-            )
 
-        logger.info(f"Last update: {last_update.isoformat()}")
+async def get_news_since_last_update() -> Dict[str, Any]:
+    """
+    Get news posted since last pacman update.
+    Parses /var/log/pacman.log for last update timestamp.
+
+    Returns:
+        Dict with news items posted after last update
+    """
+    logger.info("Getting news since last pacman update")
+
+    try:
+        update = await _load_last_update()
+
+        if "error" in update:
+            return update
 
         # Fetch recent news
-        result = await get_latest_news(limit=30)
+        result = await get_latest_news(limit=SINCE_UPDATE_NEWS_LIMIT)
 
         if "error" in result:
             return result
 
-        news_items = result.get("news", [])
-        news_since_update = []
+        return _news_since_update_result(result.get("news", []), update["last_update"])
+
+    except Exception as e:
+        logger.error(f"Failed to get news since update: {e}")
+        return create_error_response(
+            "NewsError",
+            f"Failed to get news since last update: {str(e)}"
+        )
+
+
+async def _fetch_all_news(
+    limit: int,
+    since_date: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build the latest, critical and since-update views from one feed fetch.
 
-        for item in news_items:
-            published_str = item.get("published", "")
-            if not published_str:
-                continue
+    The feed download and the pacman log lookup run concurrently.
 
-            try:
-                published = datetime.fromisoformat(published_str.replace('Z', '+00:00'))
-                if published > last_update:
-                    news_since_update.append(item)
-            except ValueError as e:
-                logger.warning(f"Failed to parse date: {e}")
-                continue
+    Args:
+        limit: Maximum number of news items for the latest/critical views
+        since_date: ISO date string for filtering the latest view
 
-        logger.info(f"Found {len(news_since_update)} news items since last update")
+    Returns:
+        Dict with "latest", "critical" and "since_update" results
+    """
+    logger.info(f"Fetching all news views (limit={limit})")
+
+    try:
+        result, update = await asyncio.gather(
+            get_latest_news(limit=max(limit, SINCE_UPDATE_NEWS_LIMIT)),
+            _load_last_update()
+        )
+
+        if "error" in result:
+            return result
+
+        news_items = result.get("news", [])
+        recent_items = news_items[:limit]
+        latest_items = [
+            item for item in recent_items
+            if not (since_date and _published_before(item["published"], since_date))
+        ]
+
+        if "error" in update:
+            since_update = update
+        else:
+            since_update = _news_since_update_result(
+                news_items[:SINCE_UPDATE_NEWS_LIMIT], update["last_update"]
+            )
 
         return {
-            "last_update": last_update.isoformat(),
-            "news_count": len(news_since_update),
-            "has_news": len(news_since_update) > 0,
-            "news": news_since_update
+            "latest": {
+                "count": len(latest_items),
+                "news": latest_items
+            },
+            "critical": _critical_news_result(recent_items),
+            "since_update": since_update
         }
 
     except Exception as e:
-        logger.error(f"Failed to get news since update: {e}")
+        logger.error(f"Failed to fetch news: {e}")
         return create_error_response(
             "NewsError",
-            f"Failed to get news since last update: {str(e)}"
+            f"Failed to fetch Arch news: {str(e)}"
         )
 
 
@@ -296,7 +572,8 @@ async def fetch_news(
     Unified news fetching tool.
     
     Args:
-        action: "latest", "critical", or "since_update"
+        action: "latest", "critical", "since_update", or "all" (all three
+            views from a single feed download)
         limit: Maximum number of news items
         since_date: ISO date string for filtering (for latest action)
     
@@ -309,10 +586,12 @@ async def fetch_news(
         return await check_critical_news(limit=limit)
     elif action == "since_update":
         return await get_news_since_last_update()
+    elif action == "all":
+        return await _fetch_all_news(limit=limit, since_date=since_date)
     else:
         return create_error_response(
             "InvalidAction",
-            f"Unknown action: {action}. Use 'latest', 'critical', or 'since_update'"
+            f"Unknown action: {action}. Use 'latest', 'critical', 'since_update', or 'all'"
         )
 
 
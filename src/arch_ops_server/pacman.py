@@ -4,38 +4,137 @@ Pacman/Official Repository interface module.
 Provides package info and update checks with hybrid local/remote approach.
 """
 
+import asyncio
+import copy
 import logging
+import os
 import re
-from pathlib import Path
+import time
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional, Union
 import httpx
 
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+from . import __version__
 from .utils import (
     IS_ARCH,
     run_command,
     create_error_response,
-    check_command_exists
+    check_command_exists,
+    from_json
 )
 
 logger = logging.getLogger(__name__)
 
+# Pacman sync database directory
+PACMAN_SYNC_DIR = "/var/lib/pacman/sync"
+
 # Arch Linux package API
 ARCH_PACKAGES_API = "https://archlinux.org/packages/search/json/"
 
 # HTTP client settings
 DEFAULT_TIMEOUT = 10.0
 
+# Seconds a remote package lookup is reused before the API is asked again
+REMOTE_CACHE_TTL = 300.0
+
+# Seconds past REMOTE_CACHE_TTL a lookup is still served while it is refreshed
+REMOTE_CACHE_SWR = 300.0
+
+# Most package lookups kept in the remote cache; least recently used go first
+REMOTE_CACHE_MAX_ENTRIES = 1024
+
+# Package name -> (remote package info, time.monotonic() when it was fetched),
+# in least to most recently used order
+_remote_cache: OrderedDict[str, tuple[Dict[str, Any], float]] = OrderedDict()
+
+# Package name -> background refresh in flight for that lookup
+_refresh_tasks: Dict[str, asyncio.Task] = {}
+
+# Seconds a database freshness report is reused; sync DBs only change on pacman -Sy
+FRESHNESS_CACHE_TTL = 15.0
+
+# (freshness report, time.monotonic() when it was computed), or None
+_freshness_cache: Optional[tuple[Dict[str, Any], float]] = None
+
+# Maximum number of package lookups run at the same time
+LOOKUP_CONCURRENCY = 16
+
+# Shared HTTP client, created on first use so lookups reuse connections
+_client: Optional[httpx.AsyncClient] = None
+
+# "Key : Value" field of pacman -Si output, including indented continuation lines
+_PACMAN_FIELD_RE = re.compile(
+    r'^(\w[\w \t]*?)[ \t]*:[ \t]*(.*(?:\n[ \t]+\S.*)*)',
+    re.MULTILINE
+)
+
+# pacman -Si fields holding whitespace-separated lists
+_PACMAN_LIST_FIELDS = frozenset({
+    'depends_on', 'optional_deps', 'required_by',
+    'conflicts_with', 'replaces', 'groups', 'provides'
+})
 
-async def get_official_package_info(package_name: str) -> Dict[str, Any]:
+# Seconds checkupdates may run; it syncs a temporary copy of the databases
+CHECKUPDATES_TIMEOUT = 30
+
+# checkupdates line: "package old_ver -> new_ver" (fallback for odd whitespace)
+_CHECKUPDATES_RE = re.compile(
+    r'^(\S+)[ \t]+(\S+)[ \t]+->[ \t]+(\S+)$',
+    re.MULTILINE
+)
+
+
+def _get_client() -> httpx.AsyncClient:
+    """
+    Get the module's shared HTTP client, creating it if needed.
+
+    Returns:
+        Open httpx.AsyncClient
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        # httpx already asks for compressed bodies (gzip, deflate, plus br/zstd
+        # when their decoders are installed); HTTP/2 needs the optional h2
+        # package and lets concurrent lookups share one connection
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(DEFAULT_TIMEOUT, connect=3.0),
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            headers={"User-Agent": f"arch-ops-server/{__version__}"},
+            http2=HTTP2_AVAILABLE
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client, if one was created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def get_official_package_info(
+    package_name: str,
+    detail: bool = True
+) -> Dict[str, Any]:
     """
     Get information about an official repository package.
     
     Uses hybrid approach:
     - If on Arch Linux: Execute `pacman -Si` for local database query
+      (or `pacman -Q` for installed packages when detail is False)
     - Otherwise: Query archlinux.org API
     
     Args:
         package_name: Package name
+        detail: Return full package details; when False, only the name and
+            installed version are looked up if the package is installed
     
     Returns:
         Dict with package information
@@ -44,6 +143,11 @@ async def get_official_package_info(package_name: str) -> Dict[str, Any]:
     
     # Try local pacman first if on Arch
     if IS_ARCH and check_command_exists("pacman"):
+        if not detail:
+            info = await _get_package_version_local(package_name)
+            if info is not None:
+                return info
+        
         info = await _get_package_info_local(package_name)
         if info is not None:
             return info
@@ -53,6 +157,103 @@ async def get_official_package_info(package_name: str) -> Dict[str, Any]:
     return await _get_package_info_remote(package_name)
 
 
+async def get_official_package_infos(
+    package_names: List[str],
+    detail: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Get information about several official repository packages concurrently.
+    
+    Args:
+        package_names: Package names
+        detail: Return full package details (see get_official_package_info)
+    
+    Returns:
+        List of package info dicts (or error responses), in input order
+    """
+    # Without local pacman every name goes to the API; ask for them together
+    if not (IS_ARCH and check_command_exists("pacman")):
+        await _prefetch_package_infos_remote(package_names)
+    
+    semaphore = asyncio.Semaphore(LOOKUP_CONCURRENCY)
+    
+    async def _lookup(package_name: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await get_official_package_info(package_name, detail=detail)
+    
+    return list(await asyncio.gather(*(_lookup(name) for name in package_names)))
+
+
+async def _prefetch_package_infos_remote(package_names: List[str]) -> None:
+    """
+    Fill the remote cache for several packages with one API request.
+    
+    Names missing from the response (or a failed request) are left to the
+    per-name lookup.
+    
+    Args:
+        package_names: Package names
+    """
+    now = time.monotonic()
+    missing = [
+        name for name in dict.fromkeys(package_names)
+        if name not in _remote_cache or now - _remote_cache[name][1] >= REMOTE_CACHE_TTL
+    ]
+    if len(missing) < 2:
+        return
+    
+    params = [("name", name) for name in missing] + [("exact", "on")]
+    
+    try:
+        response = await _get_client().get(ARCH_PACKAGES_API, params=params)
+        response.raise_for_status()
+        results = from_json(response.content).get("results", [])
+    except Exception as e:
+        logger.debug(f"Batched package info fetch failed: {e}")
+        return
+    
+    wanted = set(missing)
+    fetched_at = time.monotonic()
+    for pkg in results:
+        name = pkg.get("pkgname")
+        # First exact match wins, as in the single-name lookup
+        if name in wanted:
+            wanted.discard(name)
+            _store_remote_cache(name, _remote_package_info(pkg), fetched_at)
+    
+    logger.info(f"Batched package info fetch resolved {len(missing) - len(wanted)}/{len(missing)} packages")
+
+
+async def _get_package_version_local(package_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Query name and installed version using `pacman -Q`.
+    
+    Args:
+        package_name: Package name
+    
+    Returns:
+        Dict with name and version, or None if the package is not installed
+    """
+    try:
+        exit_code, stdout, _ = await run_command(
+            ["pacman", "-Q", package_name],
+            timeout=5,
+            check=False
+        )
+        
+        # One line: "name version"
+        fields = stdout.split()
+        if exit_code != 0 or len(fields) != 2:
+            logger.debug(f"pacman -Q failed for {package_name}")
+            return None
+        
+        return {"source": "local", "name": fields[0], "version": fields[1]}
+        
+    except Exception as e:
+        logger.warning(f"Local pacman query failed: {e}")
+        return None
+
+
 async def _get_package_info_local(package_name: str) -> Optional[Dict[str, Any]]:
     """
     Query package info using local pacman command.
@@ -96,6 +297,65 @@ async def _get_package_info_remote(package_name: str) -> Dict[str, Any]:
     Args:
         package_name: Package name
     
+    Returns:
+        Package info dict or error response
+    """
+    # Reuse a recent lookup instead of hitting the API again; an aging one is
+    # still served immediately while a background task refreshes it
+    cached = _remote_cache.get(package_name)
+    if cached:
+        _remote_cache.move_to_end(package_name)
+        age = time.monotonic() - cached[1]
+        if age < REMOTE_CACHE_TTL:
+            return copy.deepcopy(cached[0])
+        if age < REMOTE_CACHE_TTL + REMOTE_CACHE_SWR:
+            _schedule_remote_refresh(package_name)
+            return copy.deepcopy(cached[0])
+    
+    return await _fetch_package_info_remote(package_name, cached)
+
+
+def _store_remote_cache(package_name: str, info: Dict[str, Any], fetched_at: float) -> None:
+    """
+    Cache a remote lookup, evicting the least recently used past the size cap.
+    
+    Args:
+        package_name: Package name
+        info: Remote package info
+        fetched_at: time.monotonic() when it was fetched
+    """
+    _remote_cache[package_name] = (info, fetched_at)
+    _remote_cache.move_to_end(package_name)
+    while len(_remote_cache) > REMOTE_CACHE_MAX_ENTRIES:
+        _remote_cache.popitem(last=False)
+
+
+def _schedule_remote_refresh(package_name: str) -> None:
+    """
+    Refresh a cached remote lookup in the background, at most once at a time.
+    
+    Args:
+        package_name: Package name
+    """
+    if package_name in _refresh_tasks:
+        return
+    
+    task = asyncio.create_task(_fetch_package_info_remote(package_name, None))
+    _refresh_tasks[package_name] = task
+    task.add_done_callback(lambda _: _refresh_tasks.pop(package_name, None))
+
+
+async def _fetch_package_info_remote(
+    package_name: str,
+    cached: Optional[tuple[Dict[str, Any], float]]
+) -> Dict[str, Any]:
+    """
+    Fetch package info from archlinux.org API and cache it.
+    
+    Args:
+        package_name: Package name
+        cached: Expired cache entry to fall back on if the API is unavailable
+    
     Returns:
         Package info dict or error response
     """
@@ -105,57 +365,40 @@ async def _get_package_info_remote(package_name: str) -> Dict[str, Any]:
     }
     
     try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            response = await client.get(ARCH_PACKAGES_API, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            results = data.get("results", [])
-            
-            if not results:
-                return create_error_response(
-                    "NotFound",
-                    f"Official package '{package_name}' not found in repositories"
-                )
-            
-            # Take first exact match (there should only be one)
-            pkg = results[0]
-            
-            info = {
-                "source": "remote",
-                "name": pkg.get("pkgname"),
-                "repository": pkg.get("repo"),
-                "version": pkg.get("pkgver"),
-                "release": pkg.get("pkgrel"),
-                "epoch": pkg.get("epoch"),
-                "description": pkg.get("pkgdesc"),
-                "url": pkg.get("url"),
-                "architecture": pkg.get("arch"),
-                "maintainers": pkg.get("maintainers", []),
-                "packager": pkg.get("packager"),
-                "build_date": pkg.get("build_date"),
-                "last_update": pkg.get("last_update"),
-                "licenses": pkg.get("licenses", []),
-                "groups": pkg.get("groups", []),
-                "provides": pkg.get("provides", []),
-                "depends": pkg.get("depends", []),
-                "optdepends": pkg.get("optdepends", []),
-                "conflicts": pkg.get("conflicts", []),
-                "replaces": pkg.get("replaces", []),
-            }
-            
-            logger.info(f"Successfully fetched {package_name} info remotely")
-            
-            return info
-            
+        response = await _get_client().get(ARCH_PACKAGES_API, params=params)
+        response.raise_for_status()
+        
+        data = from_json(response.content)
+        results = data.get("results", [])
+        
+        if not results:
+            return create_error_response(
+                "NotFound",
+                f"Official package '{package_name}' not found in repositories"
+            )
+        
+        # Take first exact match (there should only be one)
+        pkg = results[0]
+        
+        info = _remote_package_info(pkg)
+        
+        logger.info(f"Successfully fetched {package_name} info remotely")
+        
+        _store_remote_cache(package_name, info, time.monotonic())
+        return copy.deepcopy(info)
+        
     except httpx.TimeoutException:
         logger.error(f"Remote package info fetch timed out for: {package_name}")
+        if cached:
+            return _stale_package_info(cached[0])
         return create_error_response(
             "TimeoutError",
             f"Package info fetch timed out for: {package_name}"
         )
     except httpx.HTTPStatusError as e:
         logger.error(f"Remote package info HTTP error: {e}")
+        if cached and e.response.status_code >= 500:
+            return _stale_package_info(cached[0])
         return create_error_response(
             "HTTPError",
             f"Package info fetch failed with status {e.response.status_code}",
@@ -169,6 +412,54 @@ async def _get_package_info_remote(package_name: str) -> Dict[str, Any]:
         )
 
 
+def _remote_package_info(pkg: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert one archlinux.org API search result into package info.
+    
+    Args:
+        pkg: Result entry from the packages search API
+    
+    Returns:
+        Package info dict
+    """
+    return {
+        "source": "remote",
+        "name": pkg.get("pkgname"),
+        "repository": pkg.get("repo"),
+        "version": pkg.get("pkgver"),
+        "release": pkg.get("pkgrel"),
+        "epoch": pkg.get("epoch"),
+        "description": pkg.get("pkgdesc"),
+        "url": pkg.get("url"),
+        "architecture": pkg.get("arch"),
+        "maintainers": pkg.get("maintainers", []),
+        "packager": pkg.get("packager"),
+        "build_date": pkg.get("build_date"),
+        "last_update": pkg.get("last_update"),
+        "licenses": pkg.get("licenses", []),
+        "groups": pkg.get("groups", []),
+        "provides": pkg.get("provides", []),
+        "depends": pkg.get("depends", []),
+        "optdepends": pkg.get("optdepends", []),
+        "conflicts": pkg.get("conflicts", []),
+        "replaces": pkg.get("replaces", []),
+    }
+
+
+def _stale_package_info(info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Serve an expired cached lookup when the API is unavailable.
+
+    Args:
+        info: Previously fetched remote package info
+
+    Returns:
+        Copy of the package info tagged as stale
+    """
+    logger.warning(f"Serving stale cached info for {info.get('name')}")
+    return {**copy.deepcopy(info), "stale": True}
+
+
 def _parse_pacman_output(output: str) -> Optional[Dict[str, Any]]:
     """
     Parse pacman -Si output into structured dict.
@@ -183,35 +474,18 @@ def _parse_pacman_output(output: str) -> Optional[Dict[str, Any]]:
         return None
     
     info = {}
-    current_key = None
     
-    for line in output.split('\n'):
-        # Match "Key : Value" pattern
-        match = re.match(r'^(\w[\w\s]*?)\s*:\s*(.*)$', line)
-        if match:
-            key = match.group(1).strip().lower().replace(' ', '_')
-            value = match.group(2).strip()
-            
-            # Handle special fields
-            if key in ['depends_on', 'optional_deps', 'required_by', 
-                       'conflicts_with', 'replaces', 'groups', 'provides']:
-                # These can be multi-line or space-separated
-                if value.lower() == 'none':
-                    info[key] = []
-                else:
-                    info[key] = [v.strip() for v in value.split() if v.strip()]
-            else:
-                info[key] = value
-            
-            current_key = key
-        elif current_key and line.startswith('                '):
-            # Continuation line (indented)
-            continuation = line.strip()
-            if continuation and current_key in info:
-                if isinstance(info[current_key], list):
-                    info[current_key].extend([v.strip() for v in continuation.split() if v.strip()])
-                else:
-                    info[current_key] += ' ' + continuation
+    # One scan over the whole output; each match carries its continuations
+    for match in _PACMAN_FIELD_RE.finditer(output):
+        key = match.group(1).strip().lower().replace(' ', '_')
+        value = match.group(2)
+        
+        if key in _PACMAN_LIST_FIELDS:
+            # These can be multi-line or space-separated
+            values = value.split()
+            info[key] = [] if value.strip().lower() == 'none' else values
+        else:
+            info[key] = ' '.join(line.strip() for line in value.split('\n'))
     
     return info if info else None
 
@@ -245,25 +519,13 @@ async def check_updates_dry_run() -> Dict[str, Any]:
         )
     
     try:
-        exit_code, stdout, stderr = await run_command(
-            ["checkupdates"],
-            timeout=30,  # Can take longer for sync
-            check=False
-        )
+        exit_code, updates, stderr = await _stream_checkupdates(CHECKUPDATES_TIMEOUT)
         
         # Exit code 0: updates available
         # Exit code 2: no updates available
         # Other: error
         
-        if exit_code == 2 or not stdout.strip():
-            logger.info("No updates available")
-            return {
-                "updates_available": False,
-                "count": 0,
-                "packages": []
-            }
-        
-        if exit_code != 0:
+        if exit_code not in (0, 2):
             logger.error(f"checkupdates failed with code {exit_code}: {stderr}")
             return create_error_response(
                 "CommandError",
@@ -271,8 +533,13 @@ async def check_updates_dry_run() -> Dict[str, Any]:
                 f"Exit code: {exit_code}"
             )
         
-        # Parse checkupdates output
-        updates = _parse_checkupdates_output(stdout)
+        if not updates:
+            logger.info("No updates available")
+            return {
+                "updates_available": False,
+                "count": 0,
+                "packages": []
+            }
         
         logger.info(f"Found {len(updates)} available updates")
         
@@ -282,6 +549,12 @@ async def check_updates_dry_run() -> Dict[str, Any]:
             "packages": updates
         }
         
+    except asyncio.TimeoutError:
+        return create_error_response(
+            "TimeoutError",
+            f"checkupdates timed out after {CHECKUPDATES_TIMEOUT}s",
+            "Database sync may be slow; try again later or check your mirrors"
+        )
     except Exception as e:
         logger.error(f"Update check failed: {e}")
         return create_error_response(
@@ -290,6 +563,51 @@ async def check_updates_dry_run() -> Dict[str, Any]:
         )
 
 
+async def _stream_checkupdates(timeout: float) -> tuple[int, List[Dict[str, str]], str]:
+    """
+    Run checkupdates and parse its output line by line as it arrives.
+    
+    Args:
+        timeout: Seconds to wait before the process is killed
+    
+    Returns:
+        Tuple of (exit_code, updates, stderr)
+    
+    Raises:
+        asyncio.TimeoutError: If checkupdates exceeds timeout
+    """
+    process = await asyncio.create_subprocess_exec(
+        "checkupdates",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    
+    async def _read_updates() -> List[Dict[str, str]]:
+        updates = []
+        async for line in process.stdout:
+            update = _parse_checkupdates_line(line.decode('utf-8', errors='replace'))
+            if update:
+                updates.append(update)
+        return updates
+    
+    try:
+        # Drain stderr concurrently so a full pipe cannot stall stdout; the
+        # exit wait shares the timeout, in case the process lingers after EOF
+        updates, stderr, _ = await asyncio.wait_for(
+            asyncio.gather(_read_updates(), process.stderr.read(), process.wait()),
+            timeout=timeout
+        )
+    except asyncio.TimeoutError:
+        logger.error(f"checkupdates timed out after {timeout}s")
+        # It may have exited between the timeout and the kill
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+        raise
+    
+    return process.returncode, updates, stderr.decode('utf-8', errors='replace')
+
+
 def _parse_checkupdates_output(output: str) -> List[Dict[str, str]]:
     """
     Parse checkupdates command output.
@@ -303,21 +621,45 @@ def _parse_checkupdates_output(output: str) -> List[Dict[str, str]]:
         List of update dicts
     """
     updates = []
+    for line in output.splitlines():
+        update = _parse_checkupdates_line(line)
+        if update:
+            updates.append(update)
+    return updates
+
+
+def _parse_checkupdates_line(line: str) -> Optional[Dict[str, str]]:
+    """
+    Parse one "package current_version -> new_version" line.
     
-    for line in output.strip().split('\n'):
-        if not line.strip():
-            continue
-        
-        # Match pattern: "package old_ver -> new_ver"
-        match = re.match(r'^(\S+)\s+(\S+)\s+->\s+(\S+)$', line)
-        if match:
-            updates.append({
-                "package": match.group(1),
-                "current_version": match.group(2),
-                "new_version": match.group(3)
-            })
+    Args:
+        line: Single line of checkupdates output
     
-    return updates
+    Returns:
+        Update dict, or None if the line is not an update entry
+    """
+    # Fast path: plain string splits for the usual space-separated layout
+    left, arrow, right = line.partition(" -> ")
+    if arrow and not left[:1].isspace():
+        fields = left.split()
+        new_version = right.rstrip('\n')
+        if len(fields) == 2 and new_version.split() == [new_version]:
+            return {
+                "package": fields[0],
+                "current_version": fields[1],
+                "new_version": new_version
+            }
+    
+    # Anything else (tabs, stray text) goes through the strict regex
+    match = _CHECKUPDATES_RE.match(line)
+    if not match:
+        return None
+    package, current_version, new_version = match.groups()
+    return {
+        "package": package,
+        "current_version": current_version,
+        "new_version": new_version
+    }
 
 
 async def remove_package(
@@ -1468,6 +1810,12 @@ async def manage_install_reason(
 
 
 
+def _invalidate_freshness_cache() -> None:
+    """Drop the cached freshness report, e.g. after the sync DBs were refreshed."""
+    global _freshness_cache
+    _freshness_cache = None
+
+
 async def check_database_freshness() -> Dict[str, Any]:
     """
     Check when package databases were last synchronized.
@@ -1475,28 +1823,36 @@ async def check_database_freshness() -> Dict[str, Any]:
     Returns:
         Dict with database sync timestamps per repository
     """
+    global _freshness_cache
+
     if not IS_ARCH:
         return create_error_response(
             "NotSupported",
             "Database freshness check is only available on Arch Linux"
         )
 
+    # Reuse a recent report instead of stat'ing the databases again
+    if _freshness_cache and time.monotonic() - _freshness_cache[1] < FRESHNESS_CACHE_TTL:
+        return copy.deepcopy(_freshness_cache[0])
+
     logger.info("Checking database freshness")
 
     try:
-        from datetime import datetime, timedelta
-
-        sync_dir = Path("/var/lib/pacman/sync")
-
-        if not sync_dir.exists():
+        from datetime import datetime
+
+        # Get all .db files (scandir entries carry name and type without extra syscalls)
+        try:
+            with os.scandir(PACMAN_SYNC_DIR) as entries:
+                db_files = [
+                    entry for entry in entries
+                    if entry.name.endswith(".db") and entry.is_file()
+                ]
+        except FileNotFoundError:
             return create_error_response(
                 "NotFound",
                 "Pacman sync directory not found"
             )
 
-        # Get all .db files
-        db_files = list(sync_dir.glob("*.db"))
-
         if not db_files:
             return create_error_response(
                 "NotFound",
@@ -1504,18 +1860,17 @@ async def check_database_freshness() -> Dict[str, Any]:
             )
 
         databases = []
-        now = datetime.now()
+        now = time.time()
         oldest_db = None
-        oldest_age = timedelta(0)
+        oldest_hours = 0.0
 
         for db_file in db_files:
-            mtime = datetime.fromtimestamp(db_file.stat().st_mtime)
-            age = now - mtime
-            hours_old = age.total_seconds() / 3600
+            mtime = db_file.stat().st_mtime
+            hours_old = (now - mtime) / 3600
 
             db_info = {
-                "repository": db_file.stem,  # Remove .db extension
-                "last_sync": mtime.isoformat(),
+                "repository": db_file.name[:-3],  # Remove .db extension
+                "last_sync": datetime.fromtimestamp(mtime).isoformat(),
                 "hours_old": round(hours_old, 1)
             }
 
@@ -1526,30 +1881,33 @@ async def check_database_freshness() -> Dict[str, Any]:
             databases.append(db_info)
 
             # Track oldest
-            if oldest_db is None or age > oldest_age:
+            if oldest_db is None or hours_old > oldest_hours:
                 oldest_db = db_info["repository"]
-                oldest_age = age
+                oldest_hours = hours_old
 
         # Sort by hours_old descending (oldest first)
         databases.sort(key=lambda x: x["hours_old"], reverse=True)
 
-        logger.info(f"Checked {len(databases)} databases, oldest: {oldest_age.total_seconds() / 3600:.1f}h")
+        logger.info(f"Checked {len(databases)} databases, oldest: {oldest_hours:.1f}h")
 
         recommendations = []
-        if oldest_age.total_seconds() / 3600 > 24:
+        if oldest_hours > 24:
             recommendations.append("Databases are stale (> 24h). Run 'sudo pacman -Sy' to synchronize.")
-        if oldest_age.total_seconds() / 3600 > 168:  # 1 week
+        if oldest_hours > 168:  # 1 week
             recommendations.append("Databases are very stale (> 1 week). Consider full system update.")
 
-        return {
+        result = {
             "database_count": len(databases),
             "databases": databases,
             "oldest_database": oldest_db,
-            "oldest_age_hours": round(oldest_age.total_seconds() / 3600, 1),
+            "oldest_age_hours": round(oldest_hours, 1),
             "recommendations": recommendations,
-            "needs_sync": oldest_age.total_seconds() / 3600 > 24
+            "needs_sync": oldest_hours > 24
         }
 
+        _freshness_cache = (result, time.monotonic())
+        return copy.deepcopy(result)
+
     except Exception as e:
         logger.error(f"Failed to check database freshness: {e}")
         return create_error_response(
@@ -7,7 +7,6 @@ for the Arch Linux MCP server.
 """
 
 import logging
-import json
 from typing import Any
 from urllib.parse import urlparse
 
@@ -75,6 +74,7 @@ from . import (
 )
 
 from .groups import manage_groups
+from .utils import to_json
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -426,11 +426,11 @@ async def read_resource(uri: str) -> str:
         elif len(path_parts) > 1 and path_parts[1] == "info":
             # Fetch package info
             package_info = await get_aur_info(package_name)
-            return json.dumps(package_info, indent=2)
+            return to_json(package_info)
         else:
             # Default to package info
             package_info = await get_aur_info(package_name)
-            return json.dumps(package_info, indent=2)
+            return to_json(package_info)
     
     elif scheme == "archrepo":
         # Extract package name from netloc or path
@@ -441,7 +441,7 @@ async def read_resource(uri: str) -> str:
         
         # Fetch official package info
         package_info = await get_official_package_info(package_name)
-        return json.dumps(package_info, indent=2)
+        return to_json(package_info)
     
     elif scheme == "pacman":
         if not IS_ARCH:
@@ -462,22 +462,22 @@ async def read_resource(uri: str) -> str:
                     name, version = line.strip().rsplit(' ', 1)
                     packages.append({"name": name, "version": version})
 
-            return json.dumps(packages, indent=2)
+            return to_json(packages)
 
         elif resource_path == "orphans":
             # Get orphan packages
             result = await list_orphan_packages()
-            return json.dumps(result, indent=2)
+            return to_json(result)
 
         elif resource_path == "explicit":
             # Get explicitly installed packages
             result = await list_explicit_packages()
-            return json.dumps(result, indent=2)
+            return to_json(result)
 
         elif resource_path == "groups":
             # Get all package groups
             result = await manage_groups(action="list_groups")
-            return json.dumps(result, indent=2)
+            return to_json(result)
 
         elif resource_path.startswith("group/"):
             # Get packages in specific group
@@ -485,7 +485,7 @@ async def read_resource(uri: str) -> str:
             if not group_name:
                 raise ValueError("Group name required (e.g., pacman://group/base-devel)")
             result = await manage_groups(action="list_packages_in_group", group_name=group_name)
-            return json.dumps(result, indent=2)
+            return to_json(result)
 
         elif resource_path.startswith("log/"):
             # Transaction log resources
@@ -493,17 +493,17 @@ async def read_resource(uri: str) -> str:
             
             if log_type == "recent":
                 result = await get_transaction_history()
-                return json.dumps(result, indent=2)
+                return to_json(result)
             elif log_type == "failed":
                 result = await find_failed_transactions()
-                return json.dumps(result, indent=2)
+                return to_json(result)
             else:
                 raise ValueError(f"Unsupported log resource: {log_type}")
 
         elif resource_path == "database/freshness":
             # Database freshness check
             result = await check_database_freshness()
-            return json.dumps(result, indent=2)
+            return to_json(result)
 
         else:
             raise ValueError(f"Unsupported pacman resource: {resource_path}")
@@ -514,17 +514,17 @@ async def read_resource(uri: str) -> str:
         if resource_path == "info":
             # Get system information
             result = await get_system_info()
-            return json.dumps(result, indent=2)
+            return to_json(result)
 
         elif resource_path == "disk":
             # Get disk space information
             result = await check_disk_space()
-            return json.dumps(result, indent=2)
+            return to_json(result)
 
         elif resource_path == "services/failed":
             # Get failed services
             result = await check_failed_services()
-            return json.dumps(result, indent=2)
+            return to_json(result)
 
         elif resource_path == "logs/boot":
             # Get boot logs
@@ -538,7 +538,7 @@ async def read_resource(uri: str) -> str:
         elif resource_path == "health":
             # Get system health check
             result = await run_system_health_check()
-            return json.dumps(result, indent=2)
+            return to_json(result)
 
         else:
             raise ValueError(f"Unsupported system resource: {resource_path}")
@@ -549,17 +549,17 @@ async def read_resource(uri: str) -> str:
         if resource_path == "latest":
             # Get latest news
             result = await get_latest_news()
-            return json.dumps(result, indent=2)
+            return to_json(result)
 
         elif resource_path == "critical":
             # Get critical news
             result = await check_critical_news()
-            return json.dumps(result, indent=2)
+            return to_json(result)
 
         elif resource_path == "since-update":
             # Get news since last update
             result = await get_news_since_last_update()
-            return json.dumps(result, indent=2)
+            return to_json(result)
 
         else:
             raise ValueError(f"Unsupported archnews resource: {resource_path}")
@@ -573,12 +573,12 @@ async def read_resource(uri: str) -> str:
         if resource_path == "active":
             # Get active mirrors
             result = await list_active_mirrors()
-            return json.dumps(result, indent=2)
+            return to_json(result)
 
         elif resource_path == "health":
             # Get mirror health
             result = await check_mirrorlist_health()
-            return json.dumps(result, indent=2)
+            return to_json(result)
 
         else:
             raise ValueError(f"Unsupported mirrors resource: {resource_path}")
@@ -592,12 +592,12 @@ async def read_resource(uri: str) -> str:
         if resource_path == "pacman":
             # Get pacman.conf
             result = await analyze_pacman_conf()
-            return json.dumps(result, indent=2)
+            return to_json(result)
 
         elif resource_path == "makepkg":
             # Get makepkg.conf
             result = await analyze_makepkg_conf()
-            return json.dumps(result, indent=2)
+            return to_json(result)
 
         else:
             raise ValueError(f"Unsupported config resource: {resource_path}")
@@ -678,6 +678,11 @@ async def list_tools() -> list[Tool]:
                     "package_name": {
                         "type": "string",
                         "description": "Exact package name"
+                    },
+                    "detail": {
+                        "type": "boolean",
+                        "description": "Return full package details. Set to false to only get the name and installed version (faster on Arch Linux). Default: true",
+                        "default": True
                     }
                 },
                 "required": ["package_name"]
@@ -944,13 +949,13 @@ async def list_tools() -> list[Tool]:
         # News Tools
         Tool(
             name="fetch_news",
-            description="[DISCOVERY] Unified news fetching from Arch Linux. Actions: latest (get recent news), critical (find news requiring manual intervention), since_update (news since last system update). Works on any system for latest/critical, Arch only for since_update.",
+            description="[DISCOVERY] Unified news fetching from Arch Linux. Actions: latest (get recent news), critical (find news requiring manual intervention), since_update (news since last system update), all (all three from a single feed download). Works on any system for latest/critical, Arch only for since_update.",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "action": {
                         "type": "string",
-                        "enum": ["latest", "critical", "since_update"],
+                        "enum": ["latest", "critical", "since_update", "all"],
                         "description": "Type of news query"
                     },
                     "limit": {
@@ -989,6 +994,10 @@ async def list_tools() -> list[Tool]:
                         "type": "integer",
                         "description": "Maximum number of results to return (default 50)",
                         "default": 50
+                    },
+                    "since": {
+                        "type": "string",
+                        "description": "Only consider entries at or after this ISO date or timestamp, e.g. '2025-11-01' (query_type='package')"
                     }
                 },
                 "required": ["query_type"]
@@ -1103,26 +1112,27 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
         query = arguments["query"]
         limit = arguments.get("limit", 10)
         results = await search_wiki(query, limit)
-        return [TextContent(type="text", text=json.dumps(results, indent=2))]
+        return [TextContent(type="text", text=to_json(results))]
     
     elif name == "search_aur":
         query = arguments["query"]
         limit = arguments.get("limit", 20)
         sort_by = arguments.get("sort_by", "relevance")
         results = await search_aur(query, limit, sort_by)
-        return [TextContent(type="text", text=json.dumps(results, indent=2))]
+        return [TextContent(type="text", text=to_json(results))]
     
     elif name == "get_official_package_info":
         package_name = arguments["package_name"]
-        result = await get_official_package_info(package_name)
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        detail = arguments.get("detail", True)
+        result = await get_official_package_info(package_name, detail=detail)
+        return [TextContent(type="text", text=to_json(result))]
     
     elif name == "check_updates_dry_run":
         if not IS_ARCH:
             return [TextContent(type="text", text=create_platform_error_message("check_updates_dry_run"))]
         
         result = await check_updates_dry_run()
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
     
     elif name == "install_package_secure":
         if not IS_ARCH:
@@ -1130,7 +1140,7 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
         
         package_name = arguments["package_name"]
         result = await install_package_secure(package_name)
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
     
     elif name == "audit_package_security":
         action = arguments["action"]
@@ -1138,7 +1148,7 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
         package_name = arguments.get("package_name", None)
         package_info = arguments.get("package_info", None)
         result = await audit_package_security(action, pkgbuild_content, package_name, package_info)
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
 
     # Package Removal Tools
     elif name == "remove_packages":
@@ -1149,7 +1159,7 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
         remove_dependencies = arguments.get("remove_dependencies", False)
         force = arguments.get("force", False)
         result = await remove_packages(packages, remove_dependencies, force)
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
 
     # Orphan Package Management
     elif name == "manage_orphans":
@@ -1160,7 +1170,7 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
         dry_run = arguments.get("dry_run", True)
         exclude = arguments.get("exclude", None)
         result = await manage_orphans(action, dry_run, exclude)
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
 
     # File Ownership Query
     elif name == "query_file_ownership":
@@ -1171,7 +1181,7 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
         mode = arguments["mode"]
         filter_pattern = arguments.get("filter_pattern", None)
         result = await query_file_ownership(query, mode, filter_pattern)
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
 
     # Package Verification
     elif name == "verify_package_integrity":
@@ -1181,7 +1191,7 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
         package_name = arguments["package_name"]
         thorough = arguments.get("thorough", False)
         result = await verify_package_integrity(package_name, thorough)
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
 
     # Package Groups
     elif name == "manage_groups":
@@ -1191,7 +1201,7 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
         action = arguments["action"]
         group_name = arguments.get("group_name", None)
         result = await manage_groups(action, group_name)
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
 
     # Install Reason Management
     elif name == "manage_install_reason":
@@ -1201,23 +1211,23 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
         action = arguments["action"]
         package_name = arguments.get("package_name", None)
         result = await manage_install_reason(action, package_name)
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
 
     # System Diagnostic Tools
     elif name == "get_system_info":
         result = await get_system_info()
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
 
     elif name == "analyze_storage":
         action = arguments["action"]
         result = await analyze_storage(action)
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
 
     elif name == "diagnose_system":
         action = arguments["action"]
         lines = arguments.get("lines", 100)
         result = await diagnose_system(action, lines)
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
 
     # News tools
     elif name == "fetch_news":
@@ -1225,7 +1235,7 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
         limit = arguments.get("limit", 10)
         since_date = arguments.get("since_date", None)
         result = await fetch_news(action, limit, since_date)
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
 
     # Consolidated transaction history tool
     elif name == "query_package_history":
@@ -1235,8 +1245,9 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
         query_type = arguments.get("query_type")
         package_name = arguments.get("package_name")
         limit = arguments.get("limit", 50)
-        result = await query_package_history(query_type=query_type, package_name=package_name, limit=limit)
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        since = arguments.get("since")
+        result = await query_package_history(query_type=query_type, package_name=package_name, limit=limit, since=since)
+        return [TextContent(type="text", text=to_json(result))]
 
     # Mirror management tool (consolidated)
     elif name == "optimize_mirrors":
@@ -1253,7 +1264,7 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
             limit=limit,
             auto_test=auto_test
         )
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
 
     # Configuration tools
     elif name == "analyze_pacman_conf":
@@ -1262,28 +1273,28 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent |
         
         focus = arguments.get("focus", "full")
         result = await analyze_pacman_conf(focus=focus)
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
 
     elif name == "analyze_makepkg_conf":
         if not IS_ARCH:
             return [TextContent(type="text", text=create_platform_error_message("analyze_makepkg_conf"))]
         
         result = await analyze_makepkg_conf()
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
 
     elif name == "run_system_health_check":
         if not IS_ARCH:
             return [TextContent(type="text", text=create_platform_error_message("run_system_health_check"))]
         
         result = await run_system_health_check()
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
 
     elif name == "check_database_freshness":
         if not IS_ARCH:
             return [TextContent(type="text", text=create_platform_error_message("check_database_freshness"))]
         
         result = await check_database_freshness()
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=to_json(result))]
 
     else:
         raise ValueError(f"Unknown tool: {name}")
@@ -5,12 +5,19 @@ Provides platform detection, subprocess execution, and error handling.
 """
 
 import asyncio
+import json
 import logging
-import os
 import platform
+import shutil
 from pathlib import Path
 from typing import Optional, Dict, Any
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Configure logging to stderr (STDIO server requirement)
 logging.basicConfig(
     level=logging.INFO,
@@ -175,6 +182,49 @@ def add_aur_warning(data: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def to_json(data: Any) -> str:
+    """
+    Serialize a tool result as indented JSON.
+
+    Uses orjson when it is installed (the "speedups" extra) and falls back
+    to the standard library otherwise.
+
+    Args:
+        data: JSON-serializable result
+
+    Returns:
+        JSON text indented by two spaces
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(
+                data,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            ).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits; let json handle them
+            pass
+    return json.dumps(data, indent=2)
+
+
+def from_json(content: bytes) -> Any:
+    """
+    Parse a JSON response body.
+
+    Uses orjson when it is installed and falls back to the standard library
+    otherwise.
+
+    Args:
+        content: Raw JSON bytes
+
+    Returns:
+        Parsed JSON value
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
 def create_error_response(
     error_type: str,
     message: str,
@@ -287,8 +337,8 @@ def check_command_exists(command: str) -> bool:
         bool: True if command exists, False otherwise
     """
     try:
-        result = os.system(f"which {command} > /dev/null 2>&1")
-        return result == 0
+        # PATH lookup in-process; no shell or `which` fork per check
+        return shutil.which(command) is not None
     except Exception:
         return False
 
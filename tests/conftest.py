@@ -4,61 +4,84 @@ Pytest configuration and shared fixtures for arch-ops-server tests.
 """
 
 import asyncio
-from pathlib import Path
+import functools
+import socket
+from types import SimpleNamespace
 from typing import AsyncGenerator
-from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import pytest
 
 
-@pytest.fixture
-def mock_arch_release(tmp_path: Path) -> Path:
-    """Create a temporary /etc/arch-release file."""
-    arch_release = tmp_path / "arch-release"
-    arch_release.write_text("")
-    return arch_release
+@pytest.fixture(scope="session")
+def has_network() -> bool:
+    """Probe once per session whether the AUR is reachable."""
+    try:
+        socket.create_connection(("aur.archlinux.org", 443), timeout=0.2).close()
+    except OSError:
+        return False
+    return True
 
 
-@pytest.fixture
-def mock_os_release_arch(tmp_path: Path) -> Path:
-    """Create a temporary /etc/os-release file for Arch Linux."""
-    os_release = tmp_path / "os-release"
-    os_release.write_text(
+@pytest.fixture(autouse=True)
+def skip_without_network(request):
+    """Skip tests marked requires_network when the network probe fails."""
+    if request.node.get_closest_marker("requires_network"):
+        if not request.getfixturevalue("has_network"):
+            pytest.skip("network unavailable")
+
+
+@pytest.fixture(autouse=True)
+async def cancel_leftover_tasks():
+    """Cancel tasks a test left running so they don't leak into the shared loop."""
+    yield
+    current = asyncio.current_task()
+    leftovers = [task for task in asyncio.all_tasks() if task is not current]
+    for task in leftovers:
+        task.cancel()
+    await asyncio.gather(*leftovers, return_exceptions=True)
+
+
+@pytest.fixture(scope="session")
+def mock_os_release_arch() -> str:
+    """Contents of an /etc/os-release file for Arch Linux."""
+    return (
         'NAME="Arch Linux"\n'
         'PRETTY_NAME="Arch Linux"\n'
         'ID=arch\n'
         'BUILD_ID=rolling\n'
         'ANSI_COLOR="38;2;23;147;209"\n'
     )
-    return os_release
 
 
-@pytest.fixture
-def mock_os_release_ubuntu(tmp_path: Path) -> Path:
-    """Create a temporary /etc/os-release file for Ubuntu."""
-    os_release = tmp_path / "os-release"
-    os_release.write_text(
+@pytest.fixture(scope="session")
+def mock_os_release_ubuntu() -> str:
+    """Contents of an /etc/os-release file for Ubuntu."""
+    return (
         'NAME="Ubuntu"\n'
         'VERSION="22.04 LTS (Jammy Jellyfish)"\n'
         'ID=ubuntu\n'
         'ID_LIKE=debian\n'
     )
-    return os_release
+
+
+class _FakeProcess:
+    """Process double exposing what run_command reads: communicate() and returncode."""
+
+    def __init__(self, returncode: int, stdout: bytes, stderr: bytes):
+        self.returncode = returncode
+        self._stdout = stdout
+        self._stderr = stderr
+
+    async def communicate(self, input=None):
+        return self._stdout, self._stderr
 
 
 @pytest.fixture
 def mock_subprocess_success():
     """Mock successful subprocess execution."""
-    async def _mock_communicate():
-        return (b"success output", b"")
-
-    mock_process = MagicMock()
-    mock_process.returncode = 0
-    mock_process.communicate = _mock_communicate
-
     async def _create_subprocess(*args, **kwargs):
-        return mock_process
+        return _FakeProcess(0, b"success output", b"")
 
     return _create_subprocess
 
@@ -66,15 +89,8 @@ def mock_subprocess_success():
 @pytest.fixture
 def mock_subprocess_failure():
     """Mock failed subprocess execution."""
-    async def _mock_communicate():
-        return (b"", b"error output")
-
-    mock_process = MagicMock()
-    mock_process.returncode = 1
-    mock_process.communicate = _mock_communicate
-
     async def _create_subprocess(*args, **kwargs):
-        return mock_process
+        return _FakeProcess(1, b"", b"error output")
 
     return _create_subprocess
 
@@ -86,35 +102,99 @@ async def mock_httpx_client() -> AsyncGenerator[httpx.AsyncClient, None]:
         yield client
 
 
+@pytest.fixture
+def mock_httpx_transport(monkeypatch):
+    """
+    Route every httpx.AsyncClient created during the test through a MockTransport.
+
+    Returns a namespace with:
+        set_response(url_substr, status_code=200, json=None, error=None, text=None):
+            register a canned response (or an exception to raise) for
+            requests whose URL contains url_substr; text gives a plain
+            body instead of JSON
+        requests: list of requests received, in order
+    """
+    routes = {}
+    requests = []
+
+    def set_response(url_substr, status_code=200, json=None, error=None, text=None):
+        routes[url_substr] = (status_code, json, error, text)
+
+    def handler(request):
+        requests.append(request)
+        for url_substr, (status_code, json_data, error, text) in routes.items():
+            if url_substr in str(request.url):
+                if error is not None:
+                    raise error
+                if text is not None:
+                    return httpx.Response(status_code, text=text)
+                return httpx.Response(status_code, json=json_data)
+        return httpx.Response(404)
+
+    monkeypatch.setattr(
+        httpx,
+        "AsyncClient",
+        functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(handler))
+    )
+    return SimpleNamespace(set_response=set_response, requests=requests)
+
+
+@pytest.fixture
+def system_cmd_router(monkeypatch):
+    """
+    Replace arch_ops_server.system.run_command with a canned-output router.
+
+    check_command_exists is patched too, so tests never probe the host for
+    the tools they route.
+
+    Returns a namespace with:
+        register(pattern, result): answer commands whose joined argv
+            contains pattern with result, an (exit_code, stdout, stderr)
+            tuple; earlier registrations win
+        default: result for unmatched commands, (0, "", "") unless set
+        calls: argv lists received, in order
+        has_cmd: what check_command_exists reports, True unless set
+    """
+    routes = []
+    router = SimpleNamespace(
+        register=lambda pattern, result: routes.append((pattern, result)),
+        default=(0, "", ""),
+        calls=[],
+        has_cmd=True
+    )
+
+    async def _run_command(cmd, **kwargs):
+        router.calls.append(cmd)
+        command_line = " ".join(cmd)
+        for pattern, result in routes:
+            if pattern in command_line:
+                return result
+        return router.default
+
+    monkeypatch.setattr("arch_ops_server.system.run_command", _run_command)
+    monkeypatch.setattr(
+        "arch_ops_server.system.check_command_exists", lambda *_: router.has_cmd
+    )
+    return router
+
+
 @pytest.fixture
 def mock_httpx_response():
-    """Create a mock HTTP response factory."""
+    """Create an HTTP response factory."""
     def _create_response(
         status_code: int = 200,
         json_data: dict = None,
         text_data: str = None,
         headers: dict = None
-    ) -> MagicMock:
-        """Create a mock HTTP response with specified attributes."""
-        response = MagicMock()
-        response.status_code = status_code
-        response.headers = headers or {}
-
-        if json_data is not None:
-            response.json = MagicMock(return_value=json_data)
-
-        if text_data is not None:
-            response.text = text_data
-
-        response.raise_for_status = MagicMock()
-        if status_code >= 400:
-            response.raise_for_status.side_effect = httpx.HTTPStatusError(
-                f"HTTP {status_code}",
-                request=MagicMock(),
-                response=response
-            )
-
-        return response
+    ) -> httpx.Response:
+        """Create an httpx.Response with the given status, body and headers."""
+        return httpx.Response(
+            status_code,
+            headers=headers,
+            json=json_data,
+            text=text_data,
+            request=httpx.Request("GET", "https://test.invalid/")
+        )
 
     return _create_response
 
@@ -223,7 +303,7 @@ def sample_wiki_search_results():
     }
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_pacman_info():
     """Sample pacman package info output."""
     return """Name            : vim
@@ -249,3 +329,11 @@ Install Reason  : Explicitly installed
 Install Script  : Yes
 Validated By    : Signature
 """
+
+
+@pytest.fixture(scope="session")
+def sample_pacman_info_parsed(sample_pacman_info):
+    """sample_pacman_info parsed once by _parse_pacman_output (read-only)."""
+    from arch_ops_server.pacman import _parse_pacman_output
+
+    return _parse_pacman_output(sample_pacman_info)
@@ -3,7 +3,7 @@
 Tests for arch_ops_server.aur module.
 """
 
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock
 
 import httpx
 import pytest
@@ -20,11 +20,56 @@ from arch_ops_server.aur import (
 )
 
 
+class _FakeClient:
+    """Stand-in for httpx.AsyncClient whose get() is supplied by the test."""
+
+    def __init__(self, get):
+        self.get = get
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+def _returning(response):
+    """Build an async stand-in for client.get that returns response."""
+    async def _get(*args, **kwargs):
+        return response
+
+    return _get
+
+
+def _raiser(exc):
+    """Build an async stand-in for client.get that raises exc."""
+    async def _get(*args, **kwargs):
+        raise exc
+
+    return _get
+
+
+@pytest.fixture
+def aur_client(monkeypatch):
+    """
+    Replace httpx.AsyncClient for the aur module with a _FakeClient.
+
+    Returns a function taking the get() coroutine function to install.
+    """
+    def _install(get):
+        monkeypatch.setattr(
+            "arch_ops_server.aur.httpx.AsyncClient", lambda *args, **kwargs: _FakeClient(get)
+        )
+
+    return _install
+
+
 class TestAURSearch:
     """Test AUR package search functionality."""
 
-    @pytest.mark.asyncio
-    async def test_search_aur_success(self, mock_httpx_response, sample_aur_package):
+    async def test_search_aur_success(
+        self, aur_client, mock_httpx_response, sample_aur_package
+    ):
         """Test successful AUR search."""
         mock_response = mock_httpx_response(
             status_code=200,
@@ -36,75 +81,61 @@ class TestAURSearch:
             },
         )
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+        aur_client(_returning(mock_response))
 
-            result = await search_aur("test-package")
+        result = await search_aur("test-package")
 
-            assert "data" in result
-            assert result["data"]["count"] == 1
-            assert len(result["data"]["results"]) == 1
-            # _format_package_info returns lowercase field names
-            assert result["data"]["results"][0]["name"] == "test-package"
+        assert "data" in result
+        assert result["data"]["count"] == 1
+        assert len(result["data"]["results"]) == 1
+        # _format_package_info returns lowercase field names
+        assert result["data"]["results"][0]["name"] == "test-package"
 
-    @pytest.mark.asyncio
-    async def test_search_aur_no_results(self, mock_httpx_response):
+    async def test_search_aur_no_results(self, aur_client, mock_httpx_response):
         """Test AUR search with no results."""
         mock_response = mock_httpx_response(
             status_code=200,
             json_data={"version": 5, "type": "search", "resultcount": 0, "results": []},
         )
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+        aur_client(_returning(mock_response))
 
-            result = await search_aur("nonexistent-package-xyz")
+        result = await search_aur("nonexistent-package-xyz")
 
-            assert result["data"]["count"] == 0
-            assert result["data"]["results"] == []
+        assert result["data"]["count"] == 0
+        assert result["data"]["results"] == []
 
-    @pytest.mark.asyncio
-    async def test_search_aur_timeout(self):
+    async def test_search_aur_timeout(self, aur_client):
         """Test AUR search timeout handling."""
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                side_effect=httpx.TimeoutException("Request timed out")
-            )
+        aur_client(_raiser(httpx.TimeoutException("Request timed out")))
 
-            result = await search_aur("test")
+        result = await search_aur("test")
 
-            assert result["error"] is True
-            assert result["type"] == "TimeoutError"
+        assert result["error"] is True
+        assert result["type"] == "TimeoutError"
 
-    @pytest.mark.asyncio
-    async def test_search_aur_rate_limit(self, mock_httpx_response):
+    async def test_search_aur_rate_limit(self, aur_client, mock_httpx_response):
         """Test AUR search rate limit handling."""
         mock_response = mock_httpx_response(status_code=429)
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_get = AsyncMock(return_value=mock_response)
-            mock_get.side_effect = httpx.HTTPStatusError(
-                "Too many requests", request=MagicMock(), response=mock_response
-            )
-            mock_client.return_value.__aenter__.return_value.get = mock_get
+        aur_client(_raiser(httpx.HTTPStatusError(
+            "Too many requests", request=MagicMock(), response=mock_response
+        )))
 
-            result = await search_aur("test")
+        result = await search_aur("test")
 
-            assert result["error"] is True
-            assert result["type"] == "RateLimitError"
-            # Message might not contain "429", just check it's a rate limit error
-            assert "rate limit" in result["message"].lower()
+        assert result["error"] is True
+        assert result["type"] == "RateLimitError"
+        # Message might not contain "429", just check it's a rate limit error
+        assert "rate limit" in result["message"].lower()
 
 
 class TestAURPackageInfo:
     """Test AUR package information retrieval."""
 
-    @pytest.mark.asyncio
-    async def test_get_aur_info_success(self, mock_httpx_response, sample_aur_package):
+    async def test_get_aur_info_success(
+        self, aur_client, mock_httpx_response, sample_aur_package
+    ):
         """Test successful package info retrieval."""
         mock_response = mock_httpx_response(
             status_code=200,
@@ -116,85 +147,68 @@ class TestAURPackageInfo:
             },
         )
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+        aur_client(_returning(mock_response))
 
-            result = await get_aur_info("test-package")
+        result = await get_aur_info("test-package")
 
-            assert "data" in result
-            # _format_package_info returns lowercase field names
-            assert result["data"]["name"] == "test-package"
-            assert result["data"]["version"] == "1.0.0-1"
+        assert "data" in result
+        # _format_package_info returns lowercase field names
+        assert result["data"]["name"] == "test-package"
+        assert result["data"]["version"] == "1.0.0-1"
 
-    @pytest.mark.asyncio
-    async def test_get_aur_info_not_found(self, mock_httpx_response):
+    async def test_get_aur_info_not_found(self, aur_client, mock_httpx_response):
         """Test package info for non-existent package."""
         mock_response = mock_httpx_response(
             status_code=200,
             json_data={"version": 5, "type": "info", "resultcount": 0, "results": []},
         )
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+        aur_client(_returning(mock_response))
 
-            result = await get_aur_info("nonexistent-package")
+        result = await get_aur_info("nonexistent-package")
 
-            assert result["error"] is True
-            assert result["type"] == "NotFound"
+        assert result["error"] is True
+        assert result["type"] == "NotFound"
 
 
 class TestPKGBUILDRetrieval:
     """Test PKGBUILD file retrieval."""
 
-    @pytest.mark.asyncio
-    async def test_get_pkgbuild_success(self, mock_httpx_response, sample_pkgbuild_safe):
+    async def test_get_pkgbuild_success(
+        self, aur_client, mock_httpx_response, sample_pkgbuild_safe
+    ):
         """Test successful PKGBUILD retrieval."""
         mock_response = mock_httpx_response(status_code=200, text_data=sample_pkgbuild_safe)
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+        aur_client(_returning(mock_response))
 
-            result = await get_pkgbuild("test-package")
+        result = await get_pkgbuild("test-package")
 
-            assert "pkgname=test-package" in result
-            assert "pkgver=" in result
+        assert "pkgname=test-package" in result
+        assert "pkgver=" in result
 
-    @pytest.mark.asyncio
-    async def test_get_aur_file_custom_filename(self, mock_httpx_response):
+    async def test_get_aur_file_custom_filename(self, aur_client, mock_httpx_response):
         """Test retrieval of non-PKGBUILD files."""
         mock_response = mock_httpx_response(status_code=200, text_data="install script content")
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+        aur_client(_returning(mock_response))
 
-            result = await get_aur_file("test-package", filename="install")
+        result = await get_aur_file("test-package", filename="install")
 
-            assert "install script content" in result
+        assert "install script content" in result
 
-    @pytest.mark.asyncio
-    async def test_get_pkgbuild_not_found(self, mock_httpx_response):
+    async def test_get_pkgbuild_not_found(self, aur_client, mock_httpx_response):
         """Test PKGBUILD retrieval for non-existent package."""
         mock_response = mock_httpx_response(status_code=404)
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_get = AsyncMock(return_value=mock_response)
-            mock_get.side_effect = httpx.HTTPStatusError(
-                "Not found", request=MagicMock(), response=mock_response
-            )
-            mock_client.return_value.__aenter__.return_value.get = mock_get
-
-            with pytest.raises(
-                ValueError, match="PKGBUILD not found|could not be retrieved"
-            ):
-                await get_pkgbuild("nonexistent-package")
+        aur_client(_raiser(httpx.HTTPStatusError(
+            "Not found", request=MagicMock(), response=mock_response
+        )))
+
+        with pytest.raises(
+            ValueError, match="PKGBUILD not found|could not be retrieved"
+        ):
+            await get_pkgbuild("nonexistent-package")
 
 
 class TestPKGBUILDSafetyAnalysis:
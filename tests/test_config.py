@@ -85,7 +85,6 @@ Include = /etc/pacman.d/mirrorlist
 Include = /etc/pacman.d/mirrorlist
 """
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.config.IS_ARCH", True)
     async def test_analyze_pacman_conf_success(self, sample_pacman_conf):
         """Test successful pacman.conf analysis."""
@@ -101,7 +100,6 @@ Include = /etc/pacman.d/mirrorlist
             assert "linux" in result["ignored_packages"]
             assert "firefox" in result["ignored_packages"]
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.config.IS_ARCH", True)
     async def test_analyze_pacman_conf_ignored_groups(self, sample_pacman_conf):
         """Test detecting ignored groups."""
@@ -111,7 +109,6 @@ Include = /etc/pacman.d/mirrorlist
             assert len(result["ignored_groups"]) == 1
             assert "gnome" in result["ignored_groups"]
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.config.IS_ARCH", True)
     async def test_analyze_pacman_conf_default_parallel(self):
         """Test default parallel downloads value."""
@@ -153,7 +150,6 @@ OPTIONS=(strip docs !libtool !staticlibs emptydirs zipman purge !debug lto)
 PKGEXT='.pkg.tar.zst'
 """
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.config.IS_ARCH", True)
     async def test_analyze_makepkg_conf_success(self, sample_makepkg_conf):
         """Test successful makepkg.conf analysis."""
@@ -165,7 +161,6 @@ PKGEXT='.pkg.tar.zst'
             assert "-O2" in result["cflags"]
             assert result["pkgext"] == ".pkg.tar.zst"
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.config.IS_ARCH", True)
     async def test_analyze_makepkg_conf_buildenv(self, sample_makepkg_conf):
         """Test BUILDENV parsing."""
@@ -175,7 +170,6 @@ PKGEXT='.pkg.tar.zst'
             assert "buildenv" in result
             assert isinstance(result["buildenv"], list)
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.config.IS_ARCH", True)
     async def test_analyze_makepkg_conf_options(self, sample_makepkg_conf):
         """Test OPTIONS parsing."""
@@ -201,7 +195,6 @@ IgnoreGroup = kde-applications
 Include = /etc/pacman.d/mirrorlist
 """
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.config.IS_ARCH", True)
     async def test_check_ignored_packages_success(self, pacman_conf_with_ignored):
         """Test checking ignored packages."""
@@ -214,7 +207,6 @@ Include = /etc/pacman.d/mirrorlist
             assert "systemd" in result["ignored_packages"]
             assert "glibc" in result["ignored_packages"]
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.config.IS_ARCH", True)
     async def test_check_ignored_packages_critical_warning(self, pacman_conf_with_ignored):
         """Test warning for critical ignored packages."""
@@ -225,7 +217,6 @@ Include = /etc/pacman.d/mirrorlist
             assert len(result["critical_ignored"]) > 0
             assert len(result["warnings"]) > 0
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.config.IS_ARCH", True)
     async def test_check_ignored_packages_none(self):
         """Test when no packages are ignored."""
@@ -246,7 +237,6 @@ Include = /etc/pacman.d/mirrorlist
 class TestParallelDownloads:
     """Test parallel downloads setting retrieval."""
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.config.IS_ARCH", True)
     async def test_get_parallel_downloads_default(self):
         """Test default parallel downloads value."""
@@ -264,7 +254,6 @@ Include = /etc/pacman.d/mirrorlist
             assert result["is_default"] is True
             assert len(result["recommendations"]) > 0
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.config.IS_ARCH", True)
     async def test_get_parallel_downloads_configured(self):
         """Test configured parallel downloads."""
@@ -282,7 +271,6 @@ Include = /etc/pacman.d/mirrorlist
             assert result["parallel_downloads"] == 5
             assert result["is_default"] is False
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.config.IS_ARCH", True)
     async def test_get_parallel_downloads_very_high(self):
         """Test very high parallel downloads setting."""
@@ -3,19 +3,35 @@
 Tests for arch_ops_server.logs module.
 """
 
-from unittest.mock import patch, mock_open
+from unittest.mock import patch
 
 import pytest
 
 from arch_ops_server.logs import (
+    _parse_log,
+    iter_lines_reversed,
+    log_timestamp,
     parse_log_line,
     get_transaction_history,
     find_when_installed,
+    query_package_history,
     find_failed_transactions,
     get_database_sync_history,
 )
 
 
+@pytest.fixture
+def pacman_log_file(tmp_path, monkeypatch):
+    """Write log content to a temporary file and point PACMAN_LOG at it."""
+    def _write(content):
+        log_file = tmp_path / "pacman.log"
+        log_file.write_text(content)
+        monkeypatch.setattr("arch_ops_server.logs.PACMAN_LOG", str(log_file))
+        return log_file
+
+    return _write
+
+
 class TestLogParsing:
     """Test pacman log parsing functionality."""
 
@@ -49,6 +65,49 @@ class TestLogParsing:
         
         assert result is None
 
+    @pytest.mark.parametrize(
+        "line",
+        [
+            pytest.param("[2025-11-10 15:30 [ALPM] installed vim (9.0.1000-1)", id="timestamp_unclosed"),
+            pytest.param("[2025-11-10 15:30] [ALPM installed vim (9.0.1000-1)", id="source_unclosed"),
+            pytest.param("[2025-11-10 15:30] [ALPM] installed vim (9.0.1000-1", id="version_unclosed"),
+            pytest.param("[2025-11-10 15:30] [ALPM] upgraded linux", id="version_missing"),
+            pytest.param("[2025-11-10 15:30] " + "x" * 100_000, id="long_no_source"),
+            pytest.param("[" + "2025-11-10 15:30 " * 10_000, id="long_no_delimiters"),
+        ],
+    )
+    def test_parse_log_line_malformed(self, line):
+        """Test that malformed lines are skipped instead of mis-tokenized."""
+        assert parse_log_line(line) is None
+
+    @pytest.mark.parametrize(
+        "line",
+        [
+            pytest.param("[2025-11-10 15:30 [ALPM] installed vim (9.0.1000-1)", id="unclosed"),
+            pytest.param("[2025-11-1x 15:30] [ALPM] installed vim (9.0.1000-1)", id="non_digit"),
+            pytest.param("[" + "2025-11-10 15:30 " * 10_000, id="long_no_delimiters"),
+        ],
+    )
+    def test_log_timestamp_malformed(self, line):
+        """Test that malformed prefixes yield no timestamp."""
+        assert log_timestamp(line) is None
+
+    def test_log_timestamp(self):
+        """Test timestamp extraction on the fast path and the regex fallback."""
+        assert log_timestamp("[2025-11-10 15:30] [PACMAN] synchronizing package lists") == "2025-11-10T15:30:00"
+        assert log_timestamp("[2025-11-10  15:30] [PACMAN] synchronizing package lists") == "2025-11-10T15:30:00"
+        assert log_timestamp("error: failed to commit transaction") is None
+
+    def test_iter_lines_reversed_across_chunks(self, tmp_path):
+        """Test reverse reading when lines straddle block boundaries."""
+        lines = [f"[2025-11-10 15:{i:02d}] [ALPM] installed pkg{i} (1.0-{i})" for i in range(20)]
+        log_file = tmp_path / "pacman.log"
+        log_file.write_text("\n".join(lines) + "\n")
+
+        result = list(iter_lines_reversed(log_file, chunk_size=7))
+
+        assert result == list(reversed(lines))
+
 
 class TestTransactionHistory:
     """Test transaction history retrieval."""
@@ -64,36 +123,36 @@ class TestTransactionHistory:
 [2025-11-10 15:35] [ALPM] downgraded systemd (255.2-1 -> 255.1-1)
 """
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.logs.IS_ARCH", True)
-    async def test_get_transaction_history_all(self, sample_log):
+    async def test_get_transaction_history_all(self, sample_log, pacman_log_file):
         """Test getting all transaction history."""
-        with patch("builtins.open", mock_open(read_data=sample_log)):
-            result = await get_transaction_history(limit=10, transaction_type="all")
-            
-            assert result["count"] >= 3  # At least install, upgrade, remove
-            assert any(t["source"] == "ALPM" for t in result["transactions"])
+        pacman_log_file(sample_log)
+
+        result = await get_transaction_history(limit=10, transaction_type="all")
+        
+        assert result["count"] >= 3  # At least install, upgrade, remove
+        assert any(t["source"] == "ALPM" for t in result["transactions"])
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.logs.IS_ARCH", True)
-    async def test_get_transaction_history_install_only(self, sample_log):
+    async def test_get_transaction_history_install_only(self, sample_log, pacman_log_file):
         """Test filtering by install transactions."""
-        with patch("builtins.open", mock_open(read_data=sample_log)):
-            result = await get_transaction_history(limit=10, transaction_type="install")
-            
-            assert result["transaction_type"] == "install"
-            # All returned transactions should be installations
-            for transaction in result["transactions"]:
-                assert "installed" in transaction["raw_line"].lower()
-
-    @pytest.mark.asyncio
+        pacman_log_file(sample_log)
+
+        result = await get_transaction_history(limit=10, transaction_type="install")
+        
+        assert result["transaction_type"] == "install"
+        # All returned transactions should be installations
+        for transaction in result["transactions"]:
+            assert "installed" in transaction["raw_line"].lower()
+
     @patch("arch_ops_server.logs.IS_ARCH", True)
-    async def test_get_transaction_history_with_limit(self, sample_log):
+    async def test_get_transaction_history_with_limit(self, sample_log, pacman_log_file):
         """Test transaction history with limit."""
-        with patch("builtins.open", mock_open(read_data=sample_log)):
-            result = await get_transaction_history(limit=2, transaction_type="all")
-            
-            assert result["count"] <= 2
+        pacman_log_file(sample_log)
+
+        result = await get_transaction_history(limit=2, transaction_type="all")
+        
+        assert result["count"] <= 2
 
 
 class TestPackageInstallationHistory:
@@ -109,27 +168,88 @@ class TestPackageInstallationHistory:
 [2025-11-09 14:00] [ALPM] upgraded vim (9.0.1000-1 -> 9.0.1050-1)
 """
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.logs.IS_ARCH", True)
-    async def test_find_when_installed_success(self, sample_log_with_package):
+    async def test_find_when_installed_success(self, sample_log_with_package, pacman_log_file):
         """Test finding package installation history."""
-        with patch("builtins.open", mock_open(read_data=sample_log_with_package)):
-            result = await find_when_installed("vim")
-            
-            assert result["package"] == "vim"
-            assert "first_installed" in result
-            assert result["upgrade_count"] >= 2
-            assert len(result["upgrades"]) >= 2
-
-    @pytest.mark.asyncio
+        pacman_log_file(sample_log_with_package)
+
+        result = await find_when_installed("vim")
+        
+        assert result["package"] == "vim"
+        assert "first_installed" in result
+        assert result["upgrade_count"] >= 2
+        assert len(result["upgrades"]) >= 2
+
     @patch("arch_ops_server.logs.IS_ARCH", True)
-    async def test_find_when_installed_with_removals(self, sample_log_with_package):
+    async def test_find_when_installed_with_removals(self, sample_log_with_package, pacman_log_file):
         """Test package history including removals."""
-        with patch("builtins.open", mock_open(read_data=sample_log_with_package)):
-            result = await find_when_installed("vim")
-            
-            assert result["removal_count"] >= 1
-            assert "removals" in result
+        pacman_log_file(sample_log_with_package)
+
+        result = await find_when_installed("vim")
+        
+        assert result["removal_count"] >= 1
+        assert "removals" in result
+
+    @patch("arch_ops_server.logs.IS_ARCH", True)
+    async def test_find_when_installed_since(self, sample_log_with_package, pacman_log_file):
+        """Test that entries before `since` are skipped."""
+        pacman_log_file(sample_log_with_package)
+
+        result = await find_when_installed("vim", since="2025-11-08")
+
+        assert result["first_installed"]["timestamp"] == "2025-11-08T13:00:00"
+        assert result["upgrade_count"] == 1
+        assert result["removal_count"] == 0
+
+    @patch("arch_ops_server.logs.IS_ARCH", True)
+    async def test_find_when_installed_since_unsorted(self, pacman_log_file):
+        """Test that `since` still matches entries after the clock went backwards."""
+        pacman_log_file(
+            "[2025-11-08 13:00] [ALPM] installed vim (9.0.1000-1)\n"
+            "[2025-11-06 09:00] [ALPM] upgraded vim (9.0.1000-1 -> 9.0.1050-1)\n"
+            "[2025-11-09 14:00] [ALPM] upgraded vim (9.0.1050-1 -> 9.0.1100-1)\n"
+        )
+
+        result = await find_when_installed("vim", since="2025-11-08")
+
+        assert result["first_installed"]["timestamp"] == "2025-11-08T13:00:00"
+        assert [u["timestamp"] for u in result["upgrades"]] == ["2025-11-09T14:00:00"]
+
+    @pytest.mark.parametrize("since", ["11/01/2025", "yesterday"])
+    @patch("arch_ops_server.logs.IS_ARCH", True)
+    async def test_find_when_installed_invalid_since(self, since, sample_log_with_package, pacman_log_file):
+        """Test that an unparseable `since` is rejected instead of mis-filtering."""
+        pacman_log_file(sample_log_with_package)
+
+        result = await find_when_installed("vim", since=since)
+
+        assert result["type"] == "InvalidParameter"
+
+    @patch("arch_ops_server.logs.IS_ARCH", True)
+    async def test_query_package_history_invalid_since(self, sample_log_with_package, pacman_log_file):
+        """Test that the unified tool validates `since` too."""
+        pacman_log_file(sample_log_with_package)
+
+        result = await query_package_history("package", package_name="vim", since="yesterday")
+
+        assert result["type"] == "InvalidParameter"
+
+    @patch("arch_ops_server.logs.IS_ARCH", True)
+    async def test_find_when_installed_reuses_parsed_log(self, sample_log_with_package, pacman_log_file):
+        """Test that repeated queries reuse the parsed log until it changes."""
+        log_file = pacman_log_file(sample_log_with_package)
+        _parse_log.cache_clear()
+
+        await find_when_installed("vim")
+        await find_failed_transactions()
+        assert _parse_log.cache_info().misses == 1
+        assert _parse_log.cache_info().hits == 1
+
+        log_file.write_text(sample_log_with_package + "[2025-11-10 15:00] [ALPM] removed vim (9.0.1050-1)\n")
+        result = await find_when_installed("vim")
+
+        assert _parse_log.cache_info().misses == 2
+        assert result["removal_count"] == 2
 
 
 class TestFailedTransactions:
@@ -147,37 +267,37 @@ class TestFailedTransactions:
 [2025-11-10 10:06] [ALPM] conflict detected between packages
 """
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.logs.IS_ARCH", True)
-    async def test_find_failed_transactions_success(self, sample_log_with_errors):
+    async def test_find_failed_transactions_success(self, sample_log_with_errors, pacman_log_file):
         """Test finding failed transactions."""
-        with patch("builtins.open", mock_open(read_data=sample_log_with_errors)):
-            result = await find_failed_transactions()
-            
-            assert result["has_failures"] is True
-            assert result["count"] > 0
-            
-            # Check severity classification
-            failures = result["failures"]
-            errors = [f for f in failures if f["severity"] == "error"]
-            warnings = [f for f in failures if f["severity"] == "warning"]
-            
-            assert len(errors) > 0 or len(warnings) > 0
-
-    @pytest.mark.asyncio
+        pacman_log_file(sample_log_with_errors)
+
+        result = await find_failed_transactions()
+        
+        assert result["has_failures"] is True
+        assert result["count"] > 0
+        
+        # Check severity classification
+        failures = result["failures"]
+        errors = [f for f in failures if f["severity"] == "error"]
+        warnings = [f for f in failures if f["severity"] == "warning"]
+        
+        assert len(errors) > 0 or len(warnings) > 0
+
     @patch("arch_ops_server.logs.IS_ARCH", True)
-    async def test_find_failed_transactions_none(self):
+    async def test_find_failed_transactions_none(self, pacman_log_file):
         """Test when no failures are found."""
         clean_log = """[2025-11-10 10:00] [ALPM] transaction started
 [2025-11-10 10:01] [ALPM] installed package (1.0-1)
 [2025-11-10 10:02] [ALPM] transaction completed
 """
         
-        with patch("builtins.open", mock_open(read_data=clean_log)):
-            result = await find_failed_transactions()
-            
-            # May still have some matches but should be minimal
-            assert "count" in result
+        pacman_log_file(clean_log)
+
+        result = await find_failed_transactions()
+        
+        # May still have some matches but should be minimal
+        assert "count" in result
 
 class TestDatabaseSyncHistory:
     """Test database synchronization history."""
@@ -192,26 +312,26 @@ class TestDatabaseSyncHistory:
 [2025-11-10 12:30] [PACMAN] starting full system upgrade
 """
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.logs.IS_ARCH", True)
-    async def test_get_database_sync_history_success(self, sample_log_with_syncs):
+    async def test_get_database_sync_history_success(self, sample_log_with_syncs, pacman_log_file):
         """Test getting database sync history."""
-        with patch("builtins.open", mock_open(read_data=sample_log_with_syncs)):
-            result = await get_database_sync_history(limit=10)
-            
-            assert result["count"] >= 2
-            assert len(result["sync_events"]) >= 2
-            
-            # Check event types
-            sync_types = [e["type"] for e in result["sync_events"]]
-            assert "sync" in sync_types or "full_upgrade" in sync_types
-
-    @pytest.mark.asyncio
+        pacman_log_file(sample_log_with_syncs)
+
+        result = await get_database_sync_history(limit=10)
+        
+        assert result["count"] >= 2
+        assert len(result["sync_events"]) >= 2
+        
+        # Check event types
+        sync_types = [e["type"] for e in result["sync_events"]]
+        assert "sync" in sync_types or "full_upgrade" in sync_types
+
     @patch("arch_ops_server.logs.IS_ARCH", True)
-    async def test_get_database_sync_history_with_limit(self, sample_log_with_syncs):
+    async def test_get_database_sync_history_with_limit(self, sample_log_with_syncs, pacman_log_file):
         """Test sync history with limit."""
-        with patch("builtins.open", mock_open(read_data=sample_log_with_syncs)):
-            result = await get_database_sync_history(limit=2)
-            
-            assert result["count"] <= 2
+        pacman_log_file(sample_log_with_syncs)
+
+        result = await get_database_sync_history(limit=2)
+        
+        assert result["count"] <= 2
 
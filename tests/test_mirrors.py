@@ -8,6 +8,7 @@ from unittest.mock import AsyncMock, MagicMock, patch, mock_open
 import httpx
 import pytest
 
+from arch_ops_server import mirrors
 from arch_ops_server.mirrors import (
     MIRRORLIST_PATH,
     MIRROR_STATUS_URL,
@@ -18,6 +19,16 @@ from arch_ops_server.mirrors import (
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_probe_cache():
+    """Start every test without cached mirror probes or a shared client."""
+    mirrors._probe_cache.clear()
+    mirrors._client = None
+    yield
+    mirrors._probe_cache.clear()
+    mirrors._client = None
+
+
 class TestMirrorList:
     """Test mirrorlist reading and parsing."""
 
@@ -40,7 +51,6 @@ Server = https://mirror.de1.archlinux.org/$repo/os/$arch
 # This is a comment
 """
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.mirrors.IS_ARCH", True)
     async def test_list_active_mirrors_success(self, sample_mirrorlist):
         """Test listing active mirrors."""
@@ -56,7 +66,6 @@ Server = https://mirror.de1.archlinux.org/$repo/os/$arch
                 assert mirror["active"] is True
                 assert "https://" in mirror["url"]
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.mirrors.IS_ARCH", True)
     async def test_list_active_mirrors_commented(self, sample_mirrorlist):
         """Test that commented mirrors are detected."""
@@ -74,7 +83,6 @@ Server = https://mirror.de1.archlinux.org/$repo/os/$arch
 class TestMirrorSpeed:
     """Test mirror speed testing functionality."""
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.mirrors.IS_ARCH", True)
     async def test_mirror_speed_single_success(self):
         """Test testing a single mirror."""
@@ -84,8 +92,8 @@ class TestMirrorSpeed:
         mock_response.status_code = 200
         
         with patch("httpx.AsyncClient") as mock_client, \
-             patch("time.time", side_effect=[0.0, 0.05]):  # 50ms latency
-            mock_client.return_value.__aenter__.return_value.head = AsyncMock(
+             patch("time.perf_counter", side_effect=[0.0, 0.05]):  # 50ms latency
+            mock_client.return_value.head = AsyncMock(
                 return_value=mock_response
             )
             
@@ -96,14 +104,13 @@ class TestMirrorSpeed:
             assert result["results"][0]["success"] is True
             assert result["results"][0]["latency_ms"] > 0
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.mirrors.IS_ARCH", True)
     async def test_mirror_speed_timeout(self):
         """Test mirror speed with timeout."""
         mirror_url = "https://slow-mirror.example.com/$repo/os/$arch"
         
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.head = AsyncMock(
+            mock_client.return_value.head = AsyncMock(
                 side_effect=httpx.TimeoutException("Timeout")
             )
             
@@ -113,7 +120,6 @@ class TestMirrorSpeed:
             assert result["results"][0]["success"] is False
             assert result["results"][0]["error"] == "timeout"
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.mirrors.IS_ARCH", True)
     async def test_mirror_speed_all_mirrors(self):
         """Test testing all active mirrors."""
@@ -125,8 +131,8 @@ Server = https://mirror2.example.com/$repo/os/$arch
         
         with patch("builtins.open", mock_open(read_data=mirrorlist)), \
              patch("httpx.AsyncClient") as mock_client, \
-             patch("time.time", side_effect=[0.0, 0.05, 0.1, 0.15]):
-            mock_client.return_value.__aenter__.return_value.head = AsyncMock(
+             patch("time.perf_counter", side_effect=[0.0, 0.05, 0.1, 0.15]):
+            mock_client.return_value.head = AsyncMock(
                 return_value=mock_response
             )
             
@@ -135,6 +141,45 @@ Server = https://mirror2.example.com/$repo/os/$arch
             assert result["tested_count"] == 2
             assert len(result["results"]) == 2
 
+    @patch("arch_ops_server.mirrors.IS_ARCH", True)
+    async def test_mirror_speed_reuses_recent_probes(self):
+        """Test that duplicate and recently probed mirrors are not re-tested."""
+        mirrorlist = """Server = https://mirror1.example.com/$repo/os/$arch
+Server = https://mirror1.example.com/$repo/os/$arch
+"""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+
+        with patch("builtins.open", mock_open(read_data=mirrorlist)), \
+             patch("httpx.AsyncClient") as mock_client, \
+             patch("time.perf_counter", side_effect=[0.0, 0.05]):
+            mock_head = AsyncMock(return_value=mock_response)
+            mock_client.return_value.head = mock_head
+
+            first = await test_mirror_speed()
+            second = await test_mirror_speed()
+
+            assert first["tested_count"] == 1
+            assert second["results"] == first["results"]
+            mock_head.assert_called_once()
+
+    @patch("arch_ops_server.mirrors.IS_ARCH", True)
+    async def test_mirror_speed_drops_expired_probes(self):
+        """Test that expired probes are purged when a new probe is cached."""
+        mirrors._probe_cache["https://gone.example.com/$repo/os/$arch"] = (
+            {"mirror": "https://gone.example.com/$repo/os/$arch", "success": True},
+            -mirrors.PROBE_CACHE_TTL
+        )
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.head = AsyncMock(return_value=mock_response)
+
+            await test_mirror_speed(mirror_url="https://mirror.example.com/$repo/os/$arch")
+
+        assert list(mirrors._probe_cache) == ["https://mirror.example.com/$repo/os/$arch"]
+
 
 class TestMirrorSuggestions:
     """Test mirror suggestion functionality."""
@@ -183,7 +228,6 @@ class TestMirrorSuggestions:
             ]
         }
 
-    @pytest.mark.asyncio
     async def test_suggest_fastest_mirrors_success(self, sample_mirror_status):
         """Test suggesting fastest mirrors."""
         mock_response = MagicMock()
@@ -191,7 +235,7 @@ class TestMirrorSuggestions:
         mock_response.raise_for_status = MagicMock()
         
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
             
@@ -205,7 +249,6 @@ class TestMirrorSuggestions:
                 assert mirror["completion_pct"] == 100.0
                 assert "score" in mirror
 
-    @pytest.mark.asyncio
     async def test_suggest_fastest_mirrors_with_country(self, sample_mirror_status):
         """Test suggesting mirrors filtered by country."""
         mock_response = MagicMock()
@@ -213,7 +256,7 @@ class TestMirrorSuggestions:
         mock_response.raise_for_status = MagicMock()
         
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
             
@@ -224,7 +267,6 @@ class TestMirrorSuggestions:
             for mirror in result["mirrors"]:
                 assert mirror["country_code"] == "DE"
 
-    @pytest.mark.asyncio
     async def test_suggest_fastest_mirrors_sorted_by_score(self, sample_mirror_status):
         """Test that mirrors are sorted by score."""
         mock_response = MagicMock()
@@ -232,7 +274,7 @@ class TestMirrorSuggestions:
         mock_response.raise_for_status = MagicMock()
         
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
             
@@ -242,7 +284,22 @@ class TestMirrorSuggestions:
             scores = [m["score"] for m in result["mirrors"]]
             assert scores == sorted(scores)
 
-    @pytest.mark.asyncio
+    async def test_suggest_fastest_mirrors_reuses_client(self, sample_mirror_status):
+        """Test that consecutive calls share one HTTP client."""
+        mock_response = MagicMock()
+        mock_response.json = MagicMock(return_value=sample_mirror_status)
+        mock_response.raise_for_status = MagicMock()
+
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.is_closed = False
+            mock_client.return_value.get = AsyncMock(return_value=mock_response)
+
+            await suggest_fastest_mirrors(limit=10)
+            await suggest_fastest_mirrors(country="DE", limit=10)
+
+            mock_client.assert_called_once()
+            assert mock_client.return_value.get.await_count == 2
+
     async def test_suggest_fastest_mirrors_http_error(self):
         """Test mirror suggestion with HTTP error."""
         mock_response = MagicMock()
@@ -252,7 +309,7 @@ class TestMirrorSuggestions:
         )
         
         with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
+            mock_client.return_value.get = AsyncMock(
                 return_value=mock_response
             )
             
@@ -265,7 +322,6 @@ class TestMirrorSuggestions:
 class TestMirrorlistHealth:
     """Test mirrorlist health checking."""
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.mirrors.IS_ARCH", True)
     async def test_mirrorlist_health_good(self):
         """Test healthy mirrorlist."""
@@ -278,8 +334,8 @@ Server = https://mirror3.example.com/$repo/os/$arch
         
         with patch("builtins.open", mock_open(read_data=mirrorlist)), \
              patch("httpx.AsyncClient") as mock_client, \
-             patch("time.time", side_effect=[0.0, 0.05] * 3):
-            mock_client.return_value.__aenter__.return_value.head = AsyncMock(
+             patch("time.perf_counter", side_effect=[0.0, 0.05] * 3):
+            mock_client.return_value.head = AsyncMock(
                 return_value=mock_response
             )
             
@@ -289,7 +345,6 @@ Server = https://mirror3.example.com/$repo/os/$arch
             assert result["health_score"] >= 70
             assert len(result["issues"]) == 0
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.mirrors.IS_ARCH", True)
     async def test_mirrorlist_health_no_mirrors(self):
         """Test health check with no active mirrors."""
@@ -305,7 +360,6 @@ Server = https://mirror3.example.com/$repo/os/$arch
             assert len(result["issues"]) > 0
             assert any("no active mirrors" in issue.lower() for issue in result["issues"])
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.mirrors.IS_ARCH", True)
     async def test_mirrorlist_health_high_latency(self):
         """Test health check with high latency mirrors."""
@@ -316,8 +370,8 @@ Server = https://mirror3.example.com/$repo/os/$arch
         
         with patch("builtins.open", mock_open(read_data=mirrorlist)), \
              patch("httpx.AsyncClient") as mock_client, \
-             patch("time.time", side_effect=[0.0, 2.0]):  # 2 second latency
-            mock_client.return_value.__aenter__.return_value.head = AsyncMock(
+             patch("time.perf_counter", side_effect=[0.0, 2.0]):  # 2 second latency
+            mock_client.return_value.head = AsyncMock(
                 return_value=mock_response
             )
             
@@ -4,25 +4,63 @@ Tests for arch_ops_server.news module.
 """
 
 from datetime import datetime
-from unittest.mock import AsyncMock, MagicMock, patch, mock_open
+from unittest.mock import patch
 from xml.etree import ElementTree as ET
 
 import httpx
 import pytest
 
+from arch_ops_server import news
 from arch_ops_server.news import (
     ARCH_NEWS_URL,
     CRITICAL_KEYWORDS,
     get_latest_news,
     check_critical_news,
     get_news_since_last_update,
+    fetch_news,
 )
 
 
+@pytest.fixture(autouse=True)
+def reset_client():
+    """Start every test without a shared news client or cached feed."""
+    news._client = None
+    news._feed_cache.clear()
+    yield
+    news._client = None
+    news._feed_cache.clear()
+
+
+@pytest.fixture
+def serve_feed(monkeypatch):
+    """
+    Route the shared news client through an httpx.MockTransport.
+
+    Returns a function that takes feed bytes (served with 200) or a request
+    handler, installs it, and returns the list of requests received.
+    """
+    def _serve(handler):
+        if isinstance(handler, bytes):
+            content = handler
+            handler = lambda request: httpx.Response(200, content=content)
+
+        requests = []
+
+        def _record(request):
+            requests.append(request)
+            return handler(request)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(_record))
+        monkeypatch.setattr(news, "_client", client)
+        return requests
+
+    return _serve
+
+
 class TestNewsRetrieval:
     """Test Arch Linux news feed retrieval."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def sample_rss_feed(self):
         """Sample RSS feed XML for testing."""
         return """<?xml version="1.0" encoding="utf-8"?>
@@ -49,72 +87,63 @@ class TestNewsRetrieval:
         </item>
     </channel>
 </rss>
-"""
+""".encode('utf-8')
 
-    @pytest.mark.asyncio
-    async def test_get_latest_news_success(self, sample_rss_feed):
+    async def test_get_latest_news_success(self, sample_rss_feed, serve_feed):
         """Test successful news retrieval."""
-        mock_response = MagicMock()
-        mock_response.content = sample_rss_feed.encode('utf-8')
-        mock_response.raise_for_status = MagicMock()
+        requests = serve_feed(sample_rss_feed)
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+        result = await get_latest_news(limit=10)
 
-            result = await get_latest_news(limit=10)
+        assert "gzip" in requests[0].headers["Accept-Encoding"]
 
-            assert result["count"] == 3
-            assert len(result["news"]) == 3
-            assert result["news"][0]["title"] == "Manual intervention required for foo package"
-            assert "archlinux.org" in result["news"][0]["link"]
+        assert result["count"] == 3
+        assert len(result["news"]) == 3
+        assert result["news"][0]["title"] == "Manual intervention required for foo package"
+        assert "archlinux.org" in result["news"][0]["link"]
 
-    @pytest.mark.asyncio
-    async def test_get_latest_news_with_limit(self, sample_rss_feed):
+    async def test_get_latest_news_with_limit(self, sample_rss_feed, serve_feed):
         """Test news retrieval with limit."""
-        mock_response = MagicMock()
-        mock_response.content = sample_rss_feed.encode('utf-8')
-        mock_response.raise_for_status = MagicMock()
+        serve_feed(sample_rss_feed)
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+        result = await get_latest_news(limit=2)
 
-            result = await get_latest_news(limit=2)
+        assert result["count"] == 2
+        assert len(result["news"]) == 2
 
-            assert result["count"] == 2
-            assert len(result["news"]) == 2
+    async def test_get_latest_news_not_modified(self, sample_rss_feed, serve_feed):
+        """Test that an unchanged feed is revalidated and served from cache."""
+        def handler(request):
+            if request.headers.get("If-None-Match") == '"abc"':
+                return httpx.Response(304)
+            return httpx.Response(200, content=sample_rss_feed, headers={"ETag": '"abc"'})
 
-    @pytest.mark.asyncio
-    async def test_get_latest_news_http_error(self):
-        """Test news retrieval with HTTP error."""
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-            "HTTP 500", request=MagicMock(), response=mock_response
-        )
+        requests = serve_feed(handler)
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+        first = await get_latest_news(limit=10)
+        second = await get_latest_news(limit=10)
 
-            result = await get_latest_news()
+        assert second == first
+        assert len(requests) == 2
+        assert requests[1].headers["If-None-Match"] == '"abc"'
+
+    async def test_get_latest_news_http_error(self, serve_feed):
+        """Test news retrieval with HTTP error."""
+        serve_feed(lambda request: httpx.Response(500))
+
+        result = await get_latest_news()
 
         assert "error" in result
         assert result["type"] == "HTTPError"
 
-    @pytest.mark.asyncio
-    async def test_get_latest_news_timeout(self):
+    async def test_get_latest_news_timeout(self, serve_feed):
         """Test news retrieval with timeout."""
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                side_effect=httpx.TimeoutException("Request timed out")
-            )
+        def handler(request):
+            raise httpx.ReadTimeout("Request timed out", request=request)
 
-            result = await get_latest_news()
+        serve_feed(handler)
+
+        result = await get_latest_news()
 
         assert "error" in result
         assert result["type"] == "Timeout"
@@ -123,7 +152,7 @@ class TestNewsRetrieval:
 class TestCriticalNews:
     """Test critical news detection."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def critical_rss_feed(self):
         """RSS feed with critical news items."""
         return """<?xml version="1.0" encoding="utf-8"?>
@@ -143,30 +172,21 @@ class TestCriticalNews:
         </item>
     </channel>
 </rss>
-"""
+""".encode('utf-8')
 
-    @pytest.mark.asyncio
-    async def test_check_critical_news_found(self, critical_rss_feed):
+    async def test_check_critical_news_found(self, critical_rss_feed, serve_feed):
         """Test detection of critical news."""
-        mock_response = MagicMock()
-        mock_response.content = critical_rss_feed.encode('utf-8')
-        mock_response.raise_for_status = MagicMock()
-
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+        serve_feed(critical_rss_feed)
 
-            result = await check_critical_news()
+        result = await check_critical_news()
 
-            assert result["has_critical"] is True
-            assert result["critical_count"] == 1
-            assert len(result["critical_news"]) == 1
-            assert "manual intervention" in result["critical_news"][0]["title"].lower()
-            assert "matched_keywords" in result["critical_news"][0]
+        assert result["has_critical"] is True
+        assert result["critical_count"] == 1
+        assert len(result["critical_news"]) == 1
+        assert "manual intervention" in result["critical_news"][0]["title"].lower()
+        assert "matched_keywords" in result["critical_news"][0]
 
-    @pytest.mark.asyncio
-    async def test_check_critical_news_none_found(self):
+    async def test_check_critical_news_none_found(self, serve_feed):
         """Test when no critical news is found."""
         safe_feed = """<?xml version="1.0" encoding="utf-8"?>
 <rss version="2.0">
@@ -180,25 +200,18 @@ class TestCriticalNews:
     </channel>
 </rss>
 """
-        mock_response = MagicMock()
-        mock_response.content = safe_feed.encode('utf-8')
-        mock_response.raise_for_status = MagicMock()
+        serve_feed(safe_feed.encode('utf-8'))
 
-        with patch("httpx.AsyncClient") as mock_client:
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+        result = await check_critical_news()
 
-            result = await check_critical_news()
-
-            assert result["has_critical"] is False
-            assert result["critical_count"] == 0
+        assert result["has_critical"] is False
+        assert result["critical_count"] == 0
 
 
 class TestNewsSinceUpdate:
     """Test news since last update functionality."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def sample_pacman_log(self):
         """Sample pacman log content."""
         return """[2025-11-08 10:00] [PACMAN] Running 'pacman -Syu'
@@ -206,11 +219,10 @@ class TestNewsSinceUpdate:
 [2025-11-08 10:02] [ALPM] upgraded systemd (255.1-1 -> 255.2-1)
 [2025-11-08 10:03] [PACMAN] synchronizing package lists
 [2025-11-09 15:30] [ALPM] installed test-package (1.0-1)
-"""
+""".encode('utf-8')
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.news.IS_ARCH", True)
-    async def test_get_news_since_last_update_success(self, sample_pacman_log):
+    async def test_get_news_since_last_update_success(self, sample_pacman_log, tmp_path, monkeypatch, serve_feed):
         """Test getting news since last update."""
         rss_feed = """<?xml version="1.0" encoding="utf-8"?>
 <rss version="2.0">
@@ -230,23 +242,18 @@ class TestNewsSinceUpdate:
     </channel>
 </rss>
 """
-        mock_response = MagicMock()
-        mock_response.content = rss_feed.encode('utf-8')
-        mock_response.raise_for_status = MagicMock()
+        log_file = tmp_path / "pacman.log"
+        log_file.write_bytes(sample_pacman_log)
+        monkeypatch.setattr("arch_ops_server.news.PACMAN_LOG", str(log_file))
 
-        with patch("httpx.AsyncClient") as mock_client, \
-             patch("builtins.open", mock_open(read_data=sample_pacman_log)):
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+        serve_feed(rss_feed.encode('utf-8'))
 
-            result = await get_news_since_last_update()
+        result = await get_news_since_last_update()
 
-            assert result["has_news"] is True
-            assert result["news_count"] >= 0
-            assert "last_update" in result
+        assert result["has_news"] is True
+        assert result["news_count"] >= 0
+        assert result["last_update"] == "2025-11-09T15:30:00+00:00"
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.news.IS_ARCH", False)
     async def test_get_news_since_last_update_not_arch(self):
         """Test on non-Arch system."""
@@ -255,7 +262,6 @@ class TestNewsSinceUpdate:
         assert "error" in result
         assert result["type"] == "NotSupported"
 
-    @pytest.mark.asyncio
     @patch("arch_ops_server.news.IS_ARCH", True)
     async def test_get_news_since_last_update_no_log(self):
         """Test when pacman log doesn't exist."""
@@ -265,3 +271,36 @@ class TestNewsSinceUpdate:
         assert "error" in result
         assert result["type"] == "NotFound"
 
+
+class TestFetchAllNews:
+    """Test the combined news views."""
+
+    @patch("arch_ops_server.news.IS_ARCH", False)
+    async def test_fetch_news_all_single_download(self, serve_feed):
+        """Test that all views are built from one feed download."""
+        rss_feed = """<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0">
+    <channel>
+        <item>
+            <title>Manual intervention required for glibc</title>
+            <link>https://archlinux.org/news/glibc-manual/</link>
+            <pubDate>Mon, 10 Nov 2025 10:00:00 +0000</pubDate>
+            <description><![CDATA[<p>Action required before upgrading.</p>]]></description>
+        </item>
+        <item>
+            <title>Regular package update</title>
+            <link>https://archlinux.org/news/regular/</link>
+            <pubDate>Sun, 09 Nov 2025 14:00:00 +0000</pubDate>
+            <description><![CDATA[<p>Normal update information.</p>]]></description>
+        </item>
+    </channel>
+</rss>
+"""
+        requests = serve_feed(rss_feed.encode('utf-8'))
+
+        result = await fetch_news(action="all", limit=1)
+
+        assert len(requests) == 1
+        assert result["latest"]["count"] == 1
+        assert result["critical"]["critical_count"] == 1
+        assert result["since_update"]["type"] == "NotSupported"
@@ -3,35 +3,85 @@
 Tests for arch_ops_server.pacman module.
 """
 
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
+import os
+from unittest.mock import patch
 
 import httpx
 import pytest
 
+from arch_ops_server import pacman
 from arch_ops_server.pacman import (
     ARCH_PACKAGES_API,
     _parse_checkupdates_output,
     _parse_pacman_output,
     check_updates_dry_run,
     get_official_package_info,
+    get_official_package_infos,
     check_database_freshness,
 )
 
 
+def _update(package, current_version, new_version):
+    return {"package": package, "current_version": current_version, "new_version": new_version}
+
+
+# checkupdates output with three pending updates, and the parse it should give
+CHECKUPDATES_3PKG = (
+    "vim 9.0.1000-1 -> 9.0.2000-1\n"
+    "python 3.11.0-1 -> 3.11.5-1\n"
+    "gcc 12.2.0-1 -> 13.1.0-1\n"
+)
+CHECKUPDATES_3PKG_PARSED = [
+    _update("vim", "9.0.1000-1", "9.0.2000-1"),
+    _update("python", "3.11.0-1", "3.11.5-1"),
+    _update("gcc", "12.2.0-1", "13.1.0-1"),
+]
+CHECKUPDATES_MALFORMED = (
+    CHECKUPDATES_3PKG
+    .replace("python", "malformed line without arrow\npython")
+    .replace("gcc", "another bad line\ngcc")
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_client():
+    """Start every test without a shared pacman HTTP client or cached lookups."""
+    pacman._client = None
+    pacman._remote_cache.clear()
+    pacman._refresh_tasks.clear()
+    pacman._invalidate_freshness_cache()
+    yield
+    pacman._client = None
+    pacman._remote_cache.clear()
+    pacman._refresh_tasks.clear()
+    pacman._invalidate_freshness_cache()
+
+
+@pytest.fixture
+def on_arch(monkeypatch):
+    """
+    Set pacman's platform detection for a test.
+
+    Returns a function taking is_arch and an optional has_cmd flag that
+    controls what check_command_exists reports.
+    """
+    def _set(is_arch, has_cmd=True):
+        monkeypatch.setattr(pacman, "IS_ARCH", is_arch)
+        monkeypatch.setattr(pacman, "check_command_exists", lambda *_: has_cmd)
+
+    return _set
+
+
 class TestGetOfficialPackageInfo:
     """Test hybrid local/remote package info retrieval."""
 
-    @pytest.mark.asyncio
     async def test_get_package_info_local_on_arch(
-        self, sample_pacman_info, mock_subprocess_success
+        self, on_arch, sample_pacman_info, mock_subprocess_success
     ):
         """Test local pacman query on Arch Linux."""
-        # Mock being on Arch
-        with (
-            patch("arch_ops_server.pacman.IS_ARCH", True),
-            patch("arch_ops_server.pacman.check_command_exists", return_value=True),
-            patch("arch_ops_server.pacman.run_command") as mock_run,
-        ):
+        on_arch(True)
+        with patch("arch_ops_server.pacman.run_command") as mock_run:
             # Mock successful pacman command
             mock_run.return_value = (0, sample_pacman_info, "")
 
@@ -42,119 +92,276 @@ class TestGetOfficialPackageInfo:
             assert result["version"] == "9.0.1000-1"
             mock_run.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_get_package_info_remote_not_on_arch(self, mock_httpx_response):
-        """Test remote API query when not on Arch."""
-        mock_response = mock_httpx_response(
-            status_code=200,
-            json_data={
-                "results": [
-                    {
-                        "pkgname": "vim",
-                        "pkgver": "9.0.1000",
-                        "pkgrel": "1",
-                        "pkgdesc": "Vi Improved",
-                        "url": "https://www.vim.org",
-                        "repo": "extra",
-                        "arch": "x86_64",
-                    }
-                ]
-            },
-        )
+    async def test_get_package_info_local_brief(self, on_arch):
+        """Test name/version-only lookup via pacman -Q."""
+        on_arch(True)
+        with patch("arch_ops_server.pacman.run_command") as mock_run:
+            mock_run.return_value = (0, "vim 9.0.1000-1\n", "")
 
-        with (
-            patch("arch_ops_server.pacman.IS_ARCH", False),
-            patch("httpx.AsyncClient") as mock_client,
-        ):
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
+            result = await get_official_package_info("vim", detail=False)
 
-            result = await get_official_package_info("vim")
+            assert result == {"source": "local", "name": "vim", "version": "9.0.1000-1"}
+            mock_run.assert_called_once()
+            assert mock_run.call_args[0][0] == ["pacman", "-Q", "vim"]
 
-            assert result["source"] == "remote"
-            assert result["name"] == "vim"
+    async def test_get_package_info_local_brief_not_installed(self, on_arch, sample_pacman_info):
+        """Test that a brief lookup falls back to pacman -Si when not installed."""
+        on_arch(True)
+        with patch("arch_ops_server.pacman.run_command") as mock_run:
+            mock_run.side_effect = [
+                (1, "", "error: package 'vim' was not found"),
+                (0, sample_pacman_info, ""),
+            ]
 
-    @pytest.mark.asyncio
-    async def test_get_package_info_fallback_to_remote(self, mock_httpx_response):
-        """Test fallback to remote API when local query fails."""
-        mock_response = mock_httpx_response(
-            status_code=200,
-            json_data={
-                "results": [
-                    {
-                        "pkgname": "test-pkg",
-                        "pkgver": "1.0",
-                        "pkgrel": "1",
-                        "pkgdesc": "Test package",
-                        "url": "https://example.com",
-                        "repo": "extra",
-                        "arch": "x86_64",
-                    }
-                ]
-            },
-        )
+            result = await get_official_package_info("vim", detail=False)
 
-        with (
-            patch("arch_ops_server.pacman.IS_ARCH", True),
-            patch("arch_ops_server.pacman.check_command_exists", return_value=True),
-            patch("arch_ops_server.pacman.run_command") as mock_run,
-            patch("httpx.AsyncClient") as mock_client,
-        ):
+            assert result["source"] == "local"
+            assert result["version"] == "9.0.1000-1"
+            assert mock_run.call_args[0][0] == ["pacman", "-Si", "vim"]
+
+    async def test_get_package_info_remote_not_on_arch(self, on_arch, mock_httpx_transport):
+        """Test remote API query when not on Arch."""
+        mock_httpx_transport.set_response(ARCH_PACKAGES_API, 200, {
+            "results": [
+                {
+                    "pkgname": "vim",
+                    "pkgver": "9.0.1000",
+                    "pkgrel": "1",
+                    "pkgdesc": "Vi Improved",
+                    "url": "https://www.vim.org",
+                    "repo": "extra",
+                    "arch": "x86_64",
+                }
+            ]
+        })
+
+        on_arch(False)
+        result = await get_official_package_info("vim")
+
+        assert result["source"] == "remote"
+        assert result["name"] == "vim"
+
+    async def test_get_package_info_fallback_to_remote(self, on_arch, mock_httpx_transport):
+        """Test fallback to remote API when local query fails."""
+        mock_httpx_transport.set_response(ARCH_PACKAGES_API, 200, {
+            "results": [
+                {
+                    "pkgname": "test-pkg",
+                    "pkgver": "1.0",
+                    "pkgrel": "1",
+                    "pkgdesc": "Test package",
+                    "url": "https://example.com",
+                    "repo": "extra",
+                    "arch": "x86_64",
+                }
+            ]
+        })
+
+        on_arch(True)
+        with patch("arch_ops_server.pacman.run_command") as mock_run:
             # Local query fails
             mock_run.return_value = (1, "", "error: package not found")
 
-            # Remote query succeeds
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
-            )
-
             result = await get_official_package_info("test-pkg")
 
-            assert result["source"] == "remote"
-            assert result["name"] == "test-pkg"
+        assert result["source"] == "remote"
+        assert result["name"] == "test-pkg"
 
-    @pytest.mark.asyncio
-    async def test_get_package_info_remote_not_found(self, mock_httpx_response):
+    async def test_get_package_info_remote_not_found(self, on_arch, mock_httpx_transport):
         """Test remote API when package doesn't exist."""
-        mock_response = mock_httpx_response(
-            status_code=200, json_data={"results": []}
+        mock_httpx_transport.set_response(ARCH_PACKAGES_API, 200, {"results": []})
+
+        on_arch(False)
+        result = await get_official_package_info("nonexistent-pkg")
+
+        assert result["type"] == "NotFound"
+
+    async def test_get_package_info_remote_reuses_client(self, on_arch, mock_httpx_transport):
+        """Test that consecutive remote lookups share one HTTP client."""
+        mock_httpx_transport.set_response(ARCH_PACKAGES_API, 200, {"results": []})
+
+        on_arch(False)
+        await get_official_package_info("vim")
+        client = pacman._client
+        await get_official_package_info("nano")
+
+        assert pacman._client is client
+        assert len(mock_httpx_transport.requests) == 2
+
+    async def test_get_package_info_remote_request_headers(self, on_arch, mock_httpx_transport):
+        """Test that remote lookups identify the client and accept gzip."""
+        mock_httpx_transport.set_response(ARCH_PACKAGES_API, 200, {"results": []})
+
+        on_arch(False)
+        await get_official_package_info("vim")
+
+        request = mock_httpx_transport.requests[0]
+        assert request.url.params["name"] == "vim"
+        assert "gzip" in request.headers["Accept-Encoding"]
+        assert request.headers["User-Agent"].startswith("arch-ops-server/")
+
+    async def test_get_package_info_remote_cached(self, on_arch, mock_httpx_transport):
+        """Test that a repeated lookup is served from the TTL cache."""
+        mock_httpx_transport.set_response(
+            ARCH_PACKAGES_API, 200, {"results": [{"pkgname": "vim", "pkgver": "9.0.1000"}]}
         )
 
-        with (
-            patch("arch_ops_server.pacman.IS_ARCH", False),
-            patch("httpx.AsyncClient") as mock_client,
-        ):
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                return_value=mock_response
+        on_arch(False)
+        first = await get_official_package_info("vim")
+        second = await get_official_package_info("vim")
+
+        assert second == first
+        assert len(mock_httpx_transport.requests) == 1
+
+    async def test_get_package_info_remote_cached_copy(self, on_arch, mock_httpx_transport):
+        """Test that mutating a returned lookup leaves the cached one intact."""
+        mock_httpx_transport.set_response(
+            ARCH_PACKAGES_API,
+            200,
+            {"results": [{"pkgname": "vim", "pkgver": "9.0.1000", "depends": ["glibc"]}]}
+        )
+
+        on_arch(False)
+        first = await get_official_package_info("vim")
+        first["depends"].append("tampered")
+        second = await get_official_package_info("vim")
+        second["depends"].clear()
+        third = await get_official_package_info("vim")
+
+        assert third["depends"] == ["glibc"]
+        assert len(mock_httpx_transport.requests) == 1
+
+    async def test_remote_cache_evicts_least_recently_used(self, on_arch, mock_httpx_transport):
+        """Test that the remote cache stays within its size cap."""
+        for name in ("vim", "nano", "emacs"):
+            mock_httpx_transport.set_response(
+                f"name={name}", 200, {"results": [{"pkgname": name, "pkgver": "1.0"}]}
             )
 
-            result = await get_official_package_info("nonexistent-pkg")
+        on_arch(False)
+        with patch("arch_ops_server.pacman.REMOTE_CACHE_MAX_ENTRIES", 2):
+            await get_official_package_info("vim")
+            await get_official_package_info("nano")
+            # Touch vim so nano is the least recently used
+            await get_official_package_info("vim")
+            await get_official_package_info("emacs")
+
+        assert list(pacman._remote_cache) == ["vim", "emacs"]
+
+    async def test_swr_returns_cached_and_refreshes(self, on_arch, mock_httpx_transport):
+        """Test that an aging lookup is served at once and refreshed in the background."""
+        on_arch(False)
+        with patch("arch_ops_server.pacman.REMOTE_CACHE_TTL", 0.0):
+            mock_httpx_transport.set_response(
+                ARCH_PACKAGES_API, 200, {"results": [{"pkgname": "vim", "pkgver": "9.0.1000"}]}
+            )
+            await get_official_package_info("vim")
 
-            assert result["type"] == "NotFound"
+            mock_httpx_transport.set_response(
+                ARCH_PACKAGES_API, 200, {"results": [{"pkgname": "vim", "pkgver": "9.0.2000"}]}
+            )
+            result = await get_official_package_info("vim")
 
-    @pytest.mark.asyncio
-    async def test_get_package_info_remote_timeout(self):
-        """Test remote API timeout handling."""
+            # Served from cache while the refresh runs
+            assert result["version"] == "9.0.1000"
+            await pacman._refresh_tasks["vim"]
+
+        assert len(mock_httpx_transport.requests) == 2
+        assert pacman._remote_cache["vim"][0]["version"] == "9.0.2000"
+        assert "vim" not in pacman._refresh_tasks
+
+    async def test_get_package_info_remote_stale_on_timeout(self, on_arch, mock_httpx_transport):
+        """Test that an expired lookup is served stale when the API times out."""
+        on_arch(False)
         with (
-            patch("arch_ops_server.pacman.IS_ARCH", False),
-            patch("httpx.AsyncClient") as mock_client,
+            patch("arch_ops_server.pacman.REMOTE_CACHE_TTL", 0.0),
+            patch("arch_ops_server.pacman.REMOTE_CACHE_SWR", 0.0),
         ):
-            mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-                side_effect=httpx.TimeoutException("Request timed out")
+            mock_httpx_transport.set_response(
+                ARCH_PACKAGES_API, 200, {"results": [{"pkgname": "vim", "pkgver": "9.0.1000"}]}
             )
+            await get_official_package_info("vim")
 
+            mock_httpx_transport.set_response(
+                ARCH_PACKAGES_API, error=httpx.ReadTimeout("Request timed out")
+            )
             result = await get_official_package_info("vim")
 
-            assert result["type"] == "TimeoutError"
+        assert result["name"] == "vim"
+        assert result["stale"] is True
+
+    async def test_bulk_lookup_parallel(self, on_arch):
+        """Test that per-name fallback lookups run their requests concurrently."""
+        names = ["vim", "nano", "emacs", "helix"]
+        in_flight = 0
+        calls = []
+        all_started = asyncio.Event()
+
+        async def fake_get(url, params):
+            nonlocal in_flight
+            calls.append(params)
+            if isinstance(params, list):
+                # Batched request resolves nothing, forcing per-name lookups
+                return httpx.Response(
+                    200, json={"results": []}, request=httpx.Request("GET", url)
+                )
+            in_flight += 1
+            if in_flight == len(names):
+                all_started.set()
+            # Only completes once every lookup has issued its request
+            await asyncio.wait_for(all_started.wait(), timeout=1)
+            return httpx.Response(
+                200,
+                json={"results": [{"pkgname": params["name"]}]},
+                request=httpx.Request("GET", url)
+            )
+
+        on_arch(False)
+        with patch("httpx.AsyncClient") as mock_client:
+            mock_client.return_value.is_closed = False
+            mock_client.return_value.get = fake_get
+
+            results = await get_official_package_infos(names)
+
+            assert [r["name"] for r in results] == names
+            assert len(calls) == len(names) + 1
+
+    async def test_bulk_remote_batched(self, on_arch, mock_httpx_transport):
+        """Test that remote batch lookups are resolved with one API request."""
+        mock_httpx_transport.set_response(ARCH_PACKAGES_API, 200, {
+            "results": [
+                {"pkgname": "nano", "pkgver": "8.0", "repo": "core"},
+                {"pkgname": "vim", "pkgver": "9.0.1000", "repo": "extra"},
+                {"pkgname": "vim", "pkgver": "9.0.1000", "repo": "extra-testing"},
+            ]
+        })
+
+        on_arch(False)
+        results = await get_official_package_infos(["vim", "nano", "vim"])
+
+        assert [r["name"] for r in results] == ["vim", "nano", "vim"]
+        assert results[0]["repository"] == "extra"
+        assert len(mock_httpx_transport.requests) == 1
+        assert mock_httpx_transport.requests[0].url.params.get_list("name") == ["vim", "nano"]
+
+    async def test_get_package_info_remote_timeout(self, on_arch, mock_httpx_transport):
+        """Test remote API timeout handling."""
+        mock_httpx_transport.set_response(
+            ARCH_PACKAGES_API, error=httpx.ReadTimeout("Request timed out")
+        )
+
+        on_arch(False)
+        result = await get_official_package_info("vim")
+
+        assert result["type"] == "TimeoutError"
 
 
 class TestParsePacmanOutput:
     """Test pacman output parsing."""
 
-    def test_parse_pacman_output_success(self, sample_pacman_info):
+    def test_parse_pacman_output_success(self, sample_pacman_info_parsed):
         """Test successful parsing of pacman -Si output."""
-        result = _parse_pacman_output(sample_pacman_info)
+        result = sample_pacman_info_parsed
 
         assert result is not None
         assert result["name"] == "vim"
@@ -218,179 +425,174 @@ Optional Deps   : python: Python language support
         assert result is None
 
 
+@pytest.fixture
+def fake_checkupdates(tmp_path, monkeypatch):
+    """
+    Put a stub checkupdates executable first on PATH.
+
+    Returns a function taking (stdout, exit_code, stderr) for the stub.
+    """
+    def _install(stdout="", exit_code=0, stderr=""):
+        (tmp_path / "stdout").write_text(stdout)
+        (tmp_path / "stderr").write_text(stderr)
+        script = tmp_path / "checkupdates"
+        script.write_text(
+            "#!/bin/sh\n"
+            f"cat '{tmp_path / 'stdout'}'\n"
+            f"cat '{tmp_path / 'stderr'}' >&2\n"
+            f"exit {exit_code}\n"
+        )
+        script.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    return _install
+
+
 class TestCheckUpdatesDryRun:
     """Test update checking functionality."""
 
-    @pytest.mark.asyncio
-    async def test_check_updates_success(self):
+    async def test_check_updates_success(self, on_arch, fake_checkupdates):
         """Test successful update check with available updates."""
-        checkupdates_output = """vim 9.0.1000-1 -> 9.0.2000-1
-python 3.11.0-1 -> 3.11.5-1
-gcc 12.2.0-1 -> 13.1.0-1
-"""
+        fake_checkupdates(CHECKUPDATES_3PKG)
 
-        with (
-            patch("arch_ops_server.pacman.IS_ARCH", True),
-            patch("arch_ops_server.pacman.check_command_exists", return_value=True),
-            patch("arch_ops_server.pacman.run_command") as mock_run,
-        ):
-            mock_run.return_value = (0, checkupdates_output, "")
-
-            result = await check_updates_dry_run()
+        on_arch(True)
+        result = await check_updates_dry_run()
 
-            # Returns: updates_available (bool), count, packages
-            assert result["updates_available"] is True
-            assert result["count"] == 3
-            assert len(result["packages"]) == 3
-            assert result["packages"][0]["package"] == "vim"
-            assert result["packages"][0]["current_version"] == "9.0.1000-1"
-            assert result["packages"][0]["new_version"] == "9.0.2000-1"
+        # Returns: updates_available (bool), count, packages
+        assert result["updates_available"] is True
+        assert result["count"] == 3
+        assert len(result["packages"]) == 3
+        assert result["packages"][0]["package"] == "vim"
+        assert result["packages"][0]["current_version"] == "9.0.1000-1"
+        assert result["packages"][0]["new_version"] == "9.0.2000-1"
 
-    @pytest.mark.asyncio
-    async def test_check_updates_no_updates(self):
+    async def test_check_updates_no_updates(self, on_arch, fake_checkupdates):
         """Test update check when system is up to date."""
-        with (
-            patch("arch_ops_server.pacman.IS_ARCH", True),
-            patch("arch_ops_server.pacman.check_command_exists", return_value=True),
-            patch("arch_ops_server.pacman.run_command") as mock_run,
-        ):
-            # Exit code 2 means no updates
-            mock_run.return_value = (2, "", "")
+        # Exit code 2 means no updates
+        fake_checkupdates(exit_code=2)
 
-            result = await check_updates_dry_run()
+        on_arch(True)
+        result = await check_updates_dry_run()
 
-            # Returns: updates_available (bool), count, packages
-            assert result["updates_available"] is False
-            assert result["count"] == 0
-            assert result["packages"] == []
+        # Returns: updates_available (bool), count, packages
+        assert result["updates_available"] is False
+        assert result["count"] == 0
+        assert result["packages"] == []
 
-    @pytest.mark.asyncio
-    async def test_check_updates_not_on_arch(self):
+    async def test_check_updates_not_on_arch(self, on_arch):
         """Test update check fails gracefully when not on Arch."""
-        with patch("arch_ops_server.pacman.IS_ARCH", False):
-            result = await check_updates_dry_run()
+        on_arch(False)
+        result = await check_updates_dry_run()
 
-            assert result["type"] == "NotSupported"
-            assert "Arch Linux" in result["message"]
+        assert result["type"] == "NotSupported"
+        assert "Arch Linux" in result["message"]
 
-    @pytest.mark.asyncio
-    async def test_check_updates_checkupdates_not_installed(self):
+    async def test_check_updates_checkupdates_not_installed(self, on_arch):
         """Test when checkupdates command is not available."""
-        with (
-            patch("arch_ops_server.pacman.IS_ARCH", True),
-            patch("arch_ops_server.pacman.check_command_exists", return_value=False),
-        ):
-            result = await check_updates_dry_run()
+        on_arch(True, has_cmd=False)
+        result = await check_updates_dry_run()
 
-            assert result["type"] == "CommandNotFound"
-            assert "checkupdates" in result["message"]
+        assert result["type"] == "CommandNotFound"
+        assert "checkupdates" in result["message"]
 
-    @pytest.mark.asyncio
-    async def test_check_updates_timeout(self):
+    async def test_check_updates_timeout(self, on_arch):
         """Test update check timeout handling."""
-        import asyncio
-
-        with (
-            patch("arch_ops_server.pacman.IS_ARCH", True),
-            patch("arch_ops_server.pacman.check_command_exists", return_value=True),
-            patch("arch_ops_server.pacman.run_command") as mock_run,
-        ):
-            mock_run.side_effect = asyncio.TimeoutError("Command timed out")
+        on_arch(True)
+        with patch("arch_ops_server.pacman._stream_checkupdates") as mock_stream:
+            mock_stream.side_effect = asyncio.TimeoutError("Command timed out")
 
             result = await check_updates_dry_run()
 
             assert result["error"] is True
-            # Generic exception handler returns UpdateCheckError
-            assert result["type"] == "UpdateCheckError"
+            assert result["type"] == "TimeoutError"
 
-    @pytest.mark.asyncio
-    async def test_check_updates_command_error(self):
-        """Test update check when checkupdates fails."""
-        with (
-            patch("arch_ops_server.pacman.IS_ARCH", True),
-            patch("arch_ops_server.pacman.check_command_exists", return_value=True),
-            patch("arch_ops_server.pacman.run_command") as mock_run,
-        ):
-            # Exit code 1 with some output triggers CommandError
-            # (empty stdout would be treated as no updates)
-            mock_run.return_value = (1, "some output", "error: failed to synchronize databases")
+    async def test_check_updates_kills_hung_process(self, tmp_path, monkeypatch):
+        """Test that a checkupdates run past its timeout is killed."""
+        script = tmp_path / "checkupdates"
+        script.write_text("#!/bin/sh\nexec sleep 30\n")
+        script.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
 
-            result = await check_updates_dry_run()
+        with pytest.raises(asyncio.TimeoutError):
+            await pacman._stream_checkupdates(timeout=0.2)
 
-            # Exit code 1 with output triggers CommandError
-            assert result["type"] == "CommandError"
+    async def test_check_updates_kills_lingering_process(self, tmp_path, monkeypatch):
+        """Test that the timeout also covers a process lingering after closing its pipes."""
+        script = tmp_path / "checkupdates"
+        script.write_text("#!/bin/sh\nexec >/dev/null 2>&1\nexec sleep 30\n")
+        script.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
 
+        with pytest.raises(asyncio.TimeoutError):
+            await pacman._stream_checkupdates(timeout=0.2)
 
-class TestParseCheckupdatesOutput:
-    """Test checkupdates output parsing."""
+    async def test_check_updates_timeout_after_exit(self, fake_checkupdates, monkeypatch):
+        """Test that a process exiting as the timeout fires still raises TimeoutError."""
+        fake_checkupdates(CHECKUPDATES_3PKG)
 
-    def test_parse_checkupdates_output_success(self):
-        """Test successful parsing of checkupdates output."""
-        output = """vim 9.0.1000-1 -> 9.0.2000-1
-python 3.11.0-1 -> 3.11.5-1
-gcc 12.2.0-1 -> 13.1.0-1
-"""
-        result = _parse_checkupdates_output(output)
+        async def _late_timeout(awaitable, timeout):
+            # The process finishes, then the timeout wins the race
+            await awaitable
+            raise asyncio.TimeoutError
+
+        monkeypatch.setattr(pacman.asyncio, "wait_for", _late_timeout)
 
-        assert len(result) == 3
-        assert result[0]["package"] == "vim"
-        assert result[0]["current_version"] == "9.0.1000-1"
-        assert result[0]["new_version"] == "9.0.2000-1"
-        assert result[1]["package"] == "python"
-        assert result[2]["package"] == "gcc"
+        with pytest.raises(asyncio.TimeoutError):
+            await pacman._stream_checkupdates(timeout=0.2)
 
-    def test_parse_checkupdates_output_single_update(self):
-        """Test parsing single update."""
-        output = "linux 6.1.0-1 -> 6.2.0-1\n"
-        result = _parse_checkupdates_output(output)
+    async def test_check_updates_command_error(self, on_arch, fake_checkupdates):
+        """Test update check when checkupdates fails."""
+        fake_checkupdates(exit_code=1, stderr="error: failed to synchronize databases")
 
-        assert len(result) == 1
-        assert result[0]["package"] == "linux"
+        on_arch(True)
+        result = await check_updates_dry_run()
 
-    def test_parse_checkupdates_output_empty(self):
-        """Test parsing empty output."""
-        result = _parse_checkupdates_output("")
+        # Any exit code other than 0 or 2 is a CommandError
+        assert result["type"] == "CommandError"
+        assert "failed to synchronize" in result["message"]
 
-        assert result == []
 
-    def test_parse_checkupdates_output_malformed_lines(self):
-        """Test parsing with some malformed lines."""
-        output = """vim 9.0.1000-1 -> 9.0.2000-1
-malformed line without arrow
-python 3.11.0-1 -> 3.11.5-1
-another bad line
-gcc 12.2.0-1 -> 13.1.0-1
-"""
-        result = _parse_checkupdates_output(output)
-
-        # Should only parse valid lines
-        assert len(result) == 3
-        assert result[0]["package"] == "vim"
-        assert result[1]["package"] == "python"
-        assert result[2]["package"] == "gcc"
-
-    def test_parse_checkupdates_output_with_whitespace(self):
-        """Test parsing with extra whitespace."""
-        # The regex is: ^\S+\s+\S+\s+->\s+\S+$ which requires no leading whitespace
-        # Lines with leading whitespace will be skipped
-        output = """vim   9.0.1000-1   ->   9.0.2000-1
-   python  3.11.0-1  ->  3.11.5-1
-"""
-        result = _parse_checkupdates_output(output)
+class TestParseCheckupdatesOutput:
+    """Test checkupdates output parsing."""
 
-        # Only the first line matches (no leading whitespace)
-        assert len(result) == 1
-        assert result[0]["package"] == "vim"
-        assert result[0]["current_version"] == "9.0.1000-1"
+    @pytest.mark.parametrize(
+        "output,expected",
+        [
+            pytest.param(CHECKUPDATES_3PKG, CHECKUPDATES_3PKG_PARSED, id="success"),
+            pytest.param(
+                "linux 6.1.0-1 -> 6.2.0-1\n",
+                [_update("linux", "6.1.0-1", "6.2.0-1")],
+                id="single_update",
+            ),
+            pytest.param("", [], id="empty"),
+            # Lines the fast path cannot split fall back to the regex
+            pytest.param(
+                "vim\t9.0.1000-1\t->\t9.0.2000-1\nlinux 6.1.0-1 -> 6.2.0-1 [ignored]\n",
+                [_update("vim", "9.0.1000-1", "9.0.2000-1")],
+                id="tab_separated",
+            ),
+            # Only valid lines are parsed
+            pytest.param(CHECKUPDATES_MALFORMED, CHECKUPDATES_3PKG_PARSED, id="malformed_lines"),
+            # Lines with leading whitespace are skipped
+            pytest.param(
+                "vim   9.0.1000-1   ->   9.0.2000-1\n"
+                "   python  3.11.0-1  ->  3.11.5-1\n",
+                [_update("vim", "9.0.1000-1", "9.0.2000-1")],
+                id="with_whitespace",
+            ),
+        ],
+    )
+    def test_parse_checkupdates_output(self, output, expected):
+        """Test parsing of checkupdates output."""
+        assert _parse_checkupdates_output(output) == expected
 
 
 class TestDatabaseFreshness:
     """Test package database freshness checking."""
 
-    @pytest.mark.asyncio
-    @patch("arch_ops_server.pacman.IS_ARCH", True)
-    async def test_check_database_freshness_fresh(self, tmp_path):
+    async def test_check_database_freshness_fresh(self, on_arch, tmp_path):
         """Test when databases are fresh (recently synced)."""
+        on_arch(True)
         from datetime import datetime, timedelta
         
         # Create mock database files
@@ -410,9 +612,7 @@ class TestDatabaseFreshness:
         os.utime(core_db, (recent_time, recent_time))
         os.utime(extra_db, (recent_time, recent_time))
         
-        with patch("arch_ops_server.pacman.Path") as mock_path:
-            mock_path.return_value.exists.return_value = True
-            mock_path.return_value.glob.return_value = [core_db, extra_db]
+        with patch("arch_ops_server.pacman.PACMAN_SYNC_DIR", str(core_db.parent)):
             
             result = await check_database_freshness()
             
@@ -420,10 +620,9 @@ class TestDatabaseFreshness:
             assert result["needs_sync"] is False
             assert result["oldest_age_hours"] < 2
 
-    @pytest.mark.asyncio
-    @patch("arch_ops_server.pacman.IS_ARCH", True)
-    async def test_check_database_freshness_stale(self, tmp_path):
+    async def test_check_database_freshness_stale(self, on_arch, tmp_path):
         """Test when databases are stale (> 24 hours)."""
+        on_arch(True)
         from datetime import datetime, timedelta
         
         # Create mock database files
@@ -439,9 +638,7 @@ class TestDatabaseFreshness:
         import os
         os.utime(core_db, (old_time, old_time))
         
-        with patch("arch_ops_server.pacman.Path") as mock_path:
-            mock_path.return_value.exists.return_value = True
-            mock_path.return_value.glob.return_value = [core_db]
+        with patch("arch_ops_server.pacman.PACMAN_SYNC_DIR", str(core_db.parent)):
             
             result = await check_database_freshness()
             
@@ -449,10 +646,9 @@ class TestDatabaseFreshness:
             assert result["oldest_age_hours"] > 24
             assert len(result["recommendations"]) > 0
 
-    @pytest.mark.asyncio
-    @patch("arch_ops_server.pacman.IS_ARCH", True)
-    async def test_check_database_freshness_very_stale(self, tmp_path):
+    async def test_check_database_freshness_very_stale(self, on_arch, tmp_path):
         """Test when databases are very stale (> 1 week)."""
+        on_arch(True)
         from datetime import datetime, timedelta
         
         # Create mock database files
@@ -469,9 +665,7 @@ class TestDatabaseFreshness:
         import os
         os.utime(core_db, (very_old_time, very_old_time))
         
-        with patch("arch_ops_server.pacman.Path") as mock_path:
-            mock_path.return_value.exists.return_value = True
-            mock_path.return_value.glob.return_value = [core_db]
+        with patch("arch_ops_server.pacman.PACMAN_SYNC_DIR", str(core_db.parent)):
             
             result = await check_database_freshness()
             
@@ -481,10 +675,9 @@ class TestDatabaseFreshness:
             recommendations = " ".join(result["recommendations"]).lower()
             assert "week" in recommendations or "system update" in recommendations
 
-    @pytest.mark.asyncio
-    @patch("arch_ops_server.pacman.IS_ARCH", True)
-    async def test_check_database_freshness_multiple_repos(self, tmp_path):
+    async def test_check_database_freshness_multiple_repos(self, on_arch, tmp_path):
         """Test with multiple repository databases."""
+        on_arch(True)
         from datetime import datetime, timedelta
         
         # Create mock database files with different ages
@@ -506,34 +699,79 @@ class TestDatabaseFreshness:
         os.utime(extra_db, ((now - timedelta(hours=5)).timestamp(),) * 2)
         os.utime(multilib_db, ((now - timedelta(hours=30)).timestamp(),) * 2)  # Stale
         
-        with patch("arch_ops_server.pacman.Path") as mock_path:
-            mock_path.return_value.exists.return_value = True
-            mock_path.return_value.glob.return_value = [core_db, extra_db, multilib_db]
+        with patch("arch_ops_server.pacman.PACMAN_SYNC_DIR", str(core_db.parent)):
             
             result = await check_database_freshness()
             
             assert result["database_count"] == 3
             # Oldest is multilib at 30 hours
-            assert result["oldest_age_hours"] > 24
+            assert result["oldest_database"] == "multilib"
+            assert result["oldest_age_hours"] == pytest.approx(30, abs=0.1)
             assert result["needs_sync"] is True
 
-    @pytest.mark.asyncio
-    @patch("arch_ops_server.pacman.IS_ARCH", False)
-    async def test_check_database_freshness_not_arch(self):
+    async def test_check_database_freshness_not_arch(self, on_arch):
         """Test on non-Arch system."""
+        on_arch(False)
         result = await check_database_freshness()
         
         assert "error" in result
         assert result["type"] == "NotSupported"
 
-    @pytest.mark.asyncio
-    @patch("arch_ops_server.pacman.IS_ARCH", True)
-    async def test_check_database_freshness_no_sync_dir(self):
+    async def test_check_database_freshness_no_sync_dir(self, on_arch, tmp_path):
         """Test when sync directory doesn't exist."""
-        with patch("arch_ops_server.pacman.Path") as mock_path:
-            mock_path.return_value.exists.return_value = False
-            
+        on_arch(True)
+        with patch("arch_ops_server.pacman.PACMAN_SYNC_DIR", str(tmp_path / "missing")):
             result = await check_database_freshness()
             
             assert "error" in result
             assert result["type"] == "NotFound"
+
+    async def test_check_database_freshness_cached(self, on_arch, tmp_path):
+        """Test that repeated checks reuse the report until invalidated."""
+        on_arch(True)
+        core_db = tmp_path / "core.db"
+        core_db.write_text("fake db")
+
+        with (
+            patch("arch_ops_server.pacman.PACMAN_SYNC_DIR", str(core_db.parent)),
+            patch("arch_ops_server.pacman.os.scandir", wraps=os.scandir) as mock_scandir,
+        ):
+            first = await check_database_freshness()
+            second = await check_database_freshness()
+
+            assert second == first
+            mock_scandir.assert_called_once()
+
+            pacman._invalidate_freshness_cache()
+            await check_database_freshness()
+
+            assert mock_scandir.call_count == 2
+
+    async def test_check_database_freshness_cached_copy(self, on_arch, tmp_path):
+        """Test that mutating a returned report leaves the cached one intact."""
+        on_arch(True)
+        (tmp_path / "core.db").write_text("fake db")
+
+        with patch("arch_ops_server.pacman.PACMAN_SYNC_DIR", str(tmp_path)):
+            first = await check_database_freshness()
+            first["databases"][0]["repository"] = "tampered"
+            first["recommendations"].append("tampered")
+            second = await check_database_freshness()
+            second["databases"].clear()
+            third = await check_database_freshness()
+
+        assert third["databases"][0]["repository"] == "core"
+        assert third["recommendations"] == []
+
+    async def test_check_database_freshness_ignores_non_db(self, on_arch, tmp_path):
+        """Test that only regular *.db files are counted."""
+        on_arch(True)
+        (tmp_path / "core.db").write_text("fake db")
+        (tmp_path / "core.files").write_text("fake files db")
+        (tmp_path / "download-abc.db").mkdir()
+
+        with patch("arch_ops_server.pacman.PACMAN_SYNC_DIR", str(tmp_path)):
+            result = await check_database_freshness()
+
+        assert result["database_count"] == 1
+        assert result["databases"][0]["repository"] == "core"
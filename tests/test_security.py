@@ -27,6 +27,7 @@ async def test_audit_package_security_missing_pkgbuild():
     assert "error" in result
 
 
+@pytest.mark.requires_network
 async def test_audit_package_security_metadata_risk_with_name():
     """Test metadata risk analysis with package name."""
     result = await audit_package_security(